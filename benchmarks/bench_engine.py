@@ -0,0 +1,89 @@
+import argparse
+import time
+
+from scrobbler.logic import ScrobbleEngine, Song
+
+
+def make_events(songs: int) -> list[tuple]:
+    """Build a synthetic listening session, one observation per second.
+
+    Every song plays for 200 s with a 20 s pause in the middle, every 10th song is followed by 30 s with no song
+    in the app, and every 5th song is replayed past its duration (a relisten).
+
+    Args:
+        songs (int): Number of songs in the session.
+
+    Returns:
+        list[tuple]: `(is_data, id, playing, duration)` observations.
+    """
+
+    events = []
+    for i in range(songs):
+        id = f'Song {i} - Artist {i % 50}'
+        duration = 180 if i % 5 else 90
+        events.extend((True, id, True, duration) for _ in range(100))
+        events.extend((True, id, False, duration) for _ in range(20))
+        events.extend((True, id, True, duration) for _ in range(100))
+        if i % 10 == 9:
+            events.extend((False, '', False, 0) for _ in range(30))
+
+    return events
+
+
+def run(events: list[tuple]) -> tuple[float, int]:
+    """Feed observations to a `ScrobbleEngine` on a virtual clock, like the polling loop does.
+
+    Args:
+        events (list[tuple]): Observations from `make_events()`.
+
+    Returns:
+        tuple[float, int]: Seconds taken and number of actions.
+    """
+
+    song = Song()
+    engine = ScrobbleEngine(song)
+    metadata = song.metadata
+    n_actions = 0
+
+    start = time.perf_counter()
+    for now, (is_data, id, playing, duration) in enumerate(events, 1_000_000):
+        if is_data:
+            metadata.id = metadata.title = id
+            metadata.playing = playing
+            metadata.duration = duration
+            metadata.is_app_duration = True
+        n_actions += len(engine.process(is_data, now))
+    n_actions += len(engine.finish())
+
+    return time.perf_counter() - start, n_actions
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Measure how many observations per second `ScrobbleEngine` processes. '
+        'Run from the repository root with `python -m benchmarks.bench_engine`.'
+    )
+    parser.add_argument('--songs', type=int, default=5000, help='songs in the synthetic session (default: 5000)')
+    return parser.parse_args()
+
+
+def main():
+    """Print engine throughput, best of 5 runs."""
+
+    args = parse_args()
+
+    events = make_events(args.songs)
+    seconds, n_actions = min(run(events) for _ in range(5))
+
+    print(f'{len(events)} observations, {n_actions} actions in {seconds:.3f} s')
+    print(f'{len(events) / seconds / 1e6:.2f} M observations/s, {seconds / len(events) * 1e9:.0f} ns per observation')
+
+
+if __name__ == '__main__':
+    main()
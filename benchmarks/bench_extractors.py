@@ -0,0 +1,116 @@
+import argparse
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from scrobbler.logic.am.extractors import extract_album_json, extract_album_url
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Classes `WebScraper` looked for in the BeautifulSoup tree
+SONG_CLASS = 'track-lockup svelte-1tnc1ep is-link'
+SONG_NAME_CLASS = 'click-action svelte-c0t0j2'
+
+
+def soup_album_url(search_page: bytes) -> str | None:
+    """Album URL the way `WebScraper` got it before the extractors: from a full BeautifulSoup tree."""
+
+    from bs4 import BeautifulSoup
+
+    song_tag = BeautifulSoup(search_page, 'html.parser').find('div', {'class': SONG_CLASS})
+    if not song_tag:
+        return None
+
+    song_name_tag = song_tag.find('a', {'class': SONG_NAME_CLASS})
+    if not song_name_tag:
+        return None
+
+    return song_name_tag.get('href')
+
+
+def soup_album_json(album_page: bytes) -> str | None:
+    """Album JSON the way `WebScraper` got it before the extractors: from a full BeautifulSoup tree."""
+
+    from bs4 import BeautifulSoup
+
+    script_tag = BeautifulSoup(album_page, 'html.parser').find('script', type='application/json')
+    if not script_tag:
+        return None
+
+    return script_tag.text
+
+
+def measure(func: Callable[[bytes], str | None], page: bytes, number: int) -> tuple[float, int]:
+    """Measure parse time and peak memory of an extraction.
+
+    Args:
+        func (Callable[[bytes], str | None]): Extraction function.
+        page (bytes): Page to extract from.
+        number (int): Calls per timing run, the best of 5 runs is taken.
+
+    Returns:
+        tuple[float, int]: Seconds per call and peak memory allocated during a call, in bytes.
+    """
+
+    seconds = min(timeit.repeat(lambda: func(page), number=number, repeat=5)) / number
+
+    tracemalloc.start()
+    func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Compare parse time and peak memory of the streaming extractors with the BeautifulSoup parsing they replaced. '
+        'Run from the repository root with `python -m benchmarks.bench_extractors`. '
+        'BeautifulSoup is not a dependency of the app, install `beautifulsoup4` to compare with it.'
+    )
+    parser.add_argument('--number', type=int, default=20, help='calls per timing run (default: 20)')
+    return parser.parse_args()
+
+
+def main():
+    """Print time and peak memory of every parser on every fixture."""
+
+    args = parse_args()
+
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print('beautifulsoup4 is not installed, only the extractors are measured\n')
+        has_soup = False
+    else:
+        has_soup = True
+
+    cases = [
+        ('search_page.html', extract_album_url, soup_album_url),
+        ('album_page.html', extract_album_json, soup_album_json),
+    ]
+
+    print(f'{"fixture":<18} {"parser":<14} {"time, ms":>10} {"peak, KiB":>10}')
+    for fixture, extractor, soup in cases:
+        page = (FIXTURES_DIR / fixture).read_bytes()
+
+        parsers = [('extractor', extractor)]
+        if has_soup:
+            parsers.append(('BeautifulSoup', soup))
+            if extractor(page) != soup(page):
+                print(f'{fixture}: results of the extractor and BeautifulSoup differ')
+
+        for name, func in parsers:
+            seconds, peak = measure(func, page, args.number)
+            print(f'{fixture:<18} {name:<14} {seconds * 1000:>10.3f} {peak / 1024:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import timeit
+import tracemalloc
+from typing import Callable
+
+from scrobbler.logic import Song
+
+
+class DictSong:
+    """The dict-based `Song` that `Track`/`ListenState` replaced, reduced to what the polling loop did with it."""
+
+    def __init__(self):
+        self.metadata = {
+            'title': '',
+            'artist': '',
+            'id': '',
+            'album': '',
+            'artwork': None,
+            'duration': 0,
+            'is_app_duration': False,
+            'playing': False,
+        }
+        self.state = {
+            **self.metadata,
+            'playtime': 0,
+            'started_playing': False,
+            'started_playing_timestamp': None,
+            'last_time_played': None,
+        }
+
+    def copy(self) -> 'DictSong':
+        """Copy the song, like `Song.copy()` does, for handing it to another thread."""
+
+        song = object.__new__(DictSong)
+        song.metadata = dict(self.metadata)
+        song.state = dict(self.state)
+        return song
+
+
+def dict_poll(song: DictSong, now: int) -> None:
+    """A poll of the same playing song: the app scraper writes the observation, playtime is increased."""
+
+    metadata, state = song.metadata, song.state
+    metadata['playing'] = True
+    metadata['duration'] = 180
+    metadata['is_app_duration'] = True
+    if metadata['id'] == state['id'] and state['last_time_played']:
+        state['playtime'] += now - state['last_time_played']
+    state['last_time_played'] = now
+
+
+def slots_poll(song: Song, now: int) -> None:
+    """Same as `dict_poll()` on `Song`, plus publishing the snapshot for the GUI."""
+
+    metadata, state = song.metadata, song.state
+    metadata.playing = True
+    metadata.duration = 180
+    metadata.is_app_duration = True
+    if metadata.id == state.id and state.last_time_played:
+        state.playtime += now - state.last_time_played
+    state.last_time_played = now
+    song.publish()
+
+
+def make_song(cls: type) -> Song | DictSong:
+    """Create a song that is playing for a while."""
+
+    song = cls()
+    if isinstance(song, DictSong):
+        song.metadata.update(title='Song', artist='Artist', id='Song - Artist', album='Album', duration=180, playing=True)
+        song.state.update(song.metadata, last_time_played=1)
+    else:
+        song.metadata.title, song.metadata.artist, song.metadata.id, song.metadata.album = 'Song', 'Artist', 'Song - Artist', 'Album'
+        song.metadata.duration, song.metadata.playing = 180, True
+        song.state.assign(song.metadata)
+        song.state.last_time_played = 1
+        song.publish()
+    return song
+
+
+def time_call(func: Callable[[], object], number: int) -> float:
+    """Get seconds per call, best of 5 runs."""
+
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def copy_size(song: Song | DictSong, count: int = 10_000) -> float:
+    """Get bytes allocated per copy of the song."""
+
+    tracemalloc.start()
+    copies = [song.copy() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del copies
+    return size / count
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Compare per-poll update, copy and allocation cost of `Song` with the dict-based song it replaced. '
+        'Run from the repository root with `python -m benchmarks.bench_song`.'
+    )
+    parser.add_argument('--number', type=int, default=200_000, help='calls per timing run (default: 200000)')
+    return parser.parse_args()
+
+
+def main():
+    """Print costs of both song models."""
+
+    args = parse_args()
+
+    dict_song, slots_song = make_song(DictSong), make_song(Song)
+    now = iter(range(2, 1 << 62))
+
+    rows = [
+        (
+            'poll update, us',
+            time_call(lambda: dict_poll(dict_song, next(now)), args.number) * 1e6,
+            time_call(lambda: slots_poll(slots_song, next(now)), args.number) * 1e6,
+        ),
+        (
+            'new song, us',
+            time_call(lambda: dict_song.state.update(dict_song.metadata), args.number) * 1e6,
+            time_call(lambda: slots_song.state.assign(slots_song.metadata), args.number) * 1e6,
+        ),
+        ('copy, us', time_call(dict_song.copy, args.number) * 1e6, time_call(slots_song.copy, args.number) * 1e6),
+        ('bytes per copy', copy_size(dict_song), copy_size(slots_song)),
+    ]
+
+    print(f'{"":<16} {"dict":>8} {"slots":>8}')
+    for name, dict_value, slots_value in rows:
+        print(f'{name:<16} {dict_value:>8.2f} {slots_value:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
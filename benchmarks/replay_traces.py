@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from scrobbler.logic.trace import replay
+
+TRACES_DIR = Path(__file__).parent / 'fixtures' / 'traces'
+
+
+def expected_path(trace: Path) -> Path:
+    """Get path of the file with expected output of a trace, e.g. 'session.expected.json' for 'session.trace.jsonl'."""
+
+    return trace.with_name(trace.name.removesuffix('.trace.jsonl') + '.expected.json')
+
+
+def check(trace: Path, repeat: int, update: bool) -> bool:
+    """Replay a trace, compare its scrobbles and now playing updates with the expected ones and print the result.
+
+    Args:
+        trace (Path): Path to the trace file.
+        repeat (int): Number of replays, the fastest one is reported.
+        update (bool): Whether to write the output as the expected one instead of comparing.
+
+    Returns:
+        bool: True if the output matches (or was written), False otherwise.
+    """
+
+    results = [replay(trace) for _ in range(repeat)]
+    result = min(results, key=lambda result: result['elapsed'])
+    output = {'scrobbles': result['scrobbles'], 'now_playing': result['now_playing']}
+
+    timing = f"{result['polls']} polls, {result['virtual_time']:.0f} s replayed in {result['elapsed'] * 1000:.1f} ms"
+
+    path = expected_path(trace)
+    if update:
+        path.write_text(json.dumps(output, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f'{trace.name}: expected output written, {timing}')
+        return True
+
+    try:
+        expected = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        print(f'{trace.name}: FAIL, no {path.name}, run with --update to create it')
+        return False
+
+    ok = True
+    for key in ('scrobbles', 'now_playing'):
+        if output[key] != expected[key]:
+            ok = False
+            print(f'{trace.name}: FAIL, {key} differ')
+            for i, (got, want) in enumerate(zip(output[key], expected[key])):
+                if got != want:
+                    print(f'  first difference at #{i}:\n    got:      {got}\n    expected: {want}')
+                    break
+            else:
+                print(f'  got {len(output[key])}, expected {len(expected[key])}')
+
+    if ok:
+        print(f"{trace.name}: OK, {len(output['scrobbles'])} scrobbles, {len(output['now_playing'])} now playing updates, {timing}")
+
+    return ok
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Replay recorded traces of the Apple Music app through the scrobbling loop and compare the scrobbles '
+        'and now playing updates with the expected ones. Exits with status 1 if any trace differs. '
+        'Run from the repository root with `python -m benchmarks.replay_traces`.'
+    )
+    parser.add_argument('traces', type=Path, nargs='*', help=f'trace files (default: all *.trace.jsonl in {TRACES_DIR})')
+    parser.add_argument('--repeat', type=int, default=5, help='replays per trace, the fastest one is reported (default: 5)')
+    parser.add_argument('--update', action='store_true', help='write the current output as the expected one')
+    return parser.parse_args()
+
+
+def main():
+    """Check all traces."""
+
+    args = parse_args()
+
+    traces = args.traces or sorted(TRACES_DIR.glob('*.trace.jsonl'))
+    results = [check(trace, args.repeat, args.update) for trace in traces]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
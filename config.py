@@ -13,11 +13,56 @@ class Config:
     AM_SCROBBLER_DATA_DIR = Path.home() / 'AMScrobbler'
     USER_DATA_FILE = AM_SCROBBLER_DATA_DIR / 'lastfm_user_data.json'
     LOG_FILE = AM_SCROBBLER_DATA_DIR / 'am_scrobbler.log'
+    SCROBBLE_JOURNAL_FILE = AM_SCROBBLER_DATA_DIR / 'scrobble_journal.jsonl'
+    TRACK_CACHE_FILE = AM_SCROBBLER_DATA_DIR / 'track_cache.sqlite3'
+    HTTP_CACHE_FILE = AM_SCROBBLER_DATA_DIR / 'http_cache.sqlite3'
+    ARTWORK_CACHE_DIR = AM_SCROBBLER_DATA_DIR / 'artwork'
+    AVATAR_FILE = AM_SCROBBLER_DATA_DIR / 'avatar.png'
+    FRAME_CACHE_DIR = AM_SCROBBLER_DATA_DIR / 'frames'
 
     MINIMAL_GUI = os.getenv('MINIMAL_GUI', 'true').lower() not in ('false', '0', 'no', 'n', '')
 
+    # File to record Apple Music app observations to, for replaying with `python -m scrobbler.logic.trace`
+    TRACE_FILE = os.getenv('TRACE_FILE')
+
+    # Report written by `--profile-startup`
+    STARTUP_PROFILE_FILE = AM_SCROBBLER_DATA_DIR / 'startup_profile.txt'
+
+    # Port of the Prometheus metrics endpoint on localhost (`http://127.0.0.1:<port>/metrics`), 0 to disable
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+
+    # File the JSON snapshot of metrics is written to every `METRICS_SNAPSHOT_INTERVAL` seconds, 0 to disable
+    METRICS_FILE = AM_SCROBBLER_DATA_DIR / 'metrics.json'
+    METRICS_SNAPSHOT_INTERVAL = int(os.getenv('METRICS_SNAPSHOT_INTERVAL', 5 * 60))
+
+    # Whether to start the sampling profiler at launch (it can also be toggled from the tray menu),
+    # collapsed stacks (`profile-*.folded`) and memory snapshots (`memory-*.txt`) are written to the data directory
+    PROFILE = os.getenv('PROFILE', 'false').lower() not in ('false', '0', 'no', 'n', '')
+    # Seconds between stack samples of the GUI and background threads
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.05))
+    # Seconds between `tracemalloc` snapshots while profiling, 0 to not trace memory
+    PROFILE_MEMORY_INTERVAL = int(os.getenv('PROFILE_MEMORY_INTERVAL', 10 * 60))
+
+    # Seconds Last.fm track metadata stays cached, for found and unknown tracks
+    TRACK_CACHE_TTL = int(os.getenv('TRACK_CACHE_TTL', 30 * 24 * 60 * 60))
+    TRACK_CACHE_NEGATIVE_TTL = int(os.getenv('TRACK_CACHE_NEGATIVE_TTL', 24 * 60 * 60))
+
+    # Max size of compressed web pages in the HTTP cache, in bytes
+    HTTP_CACHE_MAX_SIZE = int(os.getenv('HTTP_CACHE_MAX_SIZE', 50 * 1024 * 1024))
+
+    # Seconds the saved avatar is shown before it's downloaded again
+    AVATAR_CACHE_TTL = int(os.getenv('AVATAR_CACHE_TTL', 7 * 24 * 60 * 60))
+
+    # Max size of cached artwork thumbnails, in bytes
+    ARTWORK_CACHE_MAX_SIZE = int(os.getenv('ARTWORK_CACHE_MAX_SIZE', 20 * 1024 * 1024))
+
+    # Whether to save rendered GIF frames to disk, so later launches don't decode GIFs
+    FRAME_CACHE_ON_DISK = os.getenv('FRAME_CACHE_ON_DISK', 'true').lower() not in ('false', '0', 'no', 'n', '')
+
 
 def ensure_directories() -> None:
     """Ensure necessary directories exist"""
 
     Config.AM_SCROBBLER_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    Config.ARTWORK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    Config.FRAME_CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,206 @@
+import logging
+import time
+import tkinter as tk
+from typing import Callable
+
+from scrobbler.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class AnimationClock:
+    """Drives all frame animations of a window from a single Tk timer.
+
+    Every tick advances the animations whose current frame is over, by as many frames as their durations say
+    (so a late tick skips frames instead of slowing the animation down), and the timer is set for the end of the
+    earliest next frame. While the window isn't viewable (withdrawn or minimized) the timer is stopped altogether.
+    """
+
+    def __init__(self, root: tk.Misc, clock: Callable[[], float] = time.perf_counter):
+        """Bind the clock to the window.
+
+        Args:
+            root (tk.Misc): Tk root window.
+            clock (Callable[[], float], optional): Monotonic clock in seconds. Defaults to `time.perf_counter`.
+        """
+
+        self.root = root
+        self.clock = clock
+
+        # Animated widget -> [index of the displayed frame, time in ms when it ends]
+        self._animations = {}
+        self._after_id = None
+        self._next_tick = None
+        self._suspended = False
+
+        self.frames_rendered = 0
+        self.ticks = 0
+        self.total_tick_time = 0.0
+        self.max_tick_time = 0.0
+        self.running_time = 0.0
+        self._running_since = self.clock()
+
+        root.bind('<Map>', self._on_map, add='+')
+        root.bind('<Unmap>', self._on_unmap, add='+')
+
+        registry.register_collector('animation', self.stats)
+
+    @classmethod
+    def of(cls, widget: tk.Misc) -> 'AnimationClock':
+        """Get the clock of the widget's Tk root, creating it on first use.
+
+        Args:
+            widget (tk.Misc): Any widget of the window.
+
+        Returns:
+            AnimationClock: Clock of the window.
+        """
+
+        root = widget._root()
+        clock = getattr(root, 'animation_clock', None)
+        if clock is None:
+            clock = root.animation_clock = cls(root)
+        return clock
+
+    def _now(self) -> float:
+        return self.clock() * 1000
+
+    def start(self, widget) -> None:
+        """Start animating a widget from its first frame.
+
+        The widget must have `durations` (of frames, in ms) and `show_frame(index)`.
+
+        Args:
+            widget: Widget to animate.
+        """
+
+        now = self._now()
+        widget.show_frame(0)
+        self._animations[widget] = [0, now + widget.durations[0]]
+        self._schedule(now)
+
+    def stop(self, widget) -> None:
+        """Stop animating a widget.
+
+        Args:
+            widget: Widget to stop animating.
+        """
+
+        self._animations.pop(widget, None)
+        if not self._animations:
+            self._cancel()
+
+    def _tick(self) -> None:
+        """Advance animations whose current frame is over."""
+
+        self._after_id = None
+        self._next_tick = None
+
+        if not self.root.winfo_viewable():
+            self._suspend()
+            return
+
+        start = self.clock()
+        now = start * 1000
+
+        for widget, state in self._animations.items():
+            frame, ends = state
+            if ends > now:
+                continue
+
+            durations = widget.durations
+            if now - ends > sum(durations):
+                # Far behind (e.g., the main loop was blocked), start the next frame now instead of catching up
+                frame = (frame + 1) % len(durations)
+                ends = now + durations[frame]
+            else:
+                while ends <= now:
+                    frame = (frame + 1) % len(durations)
+                    ends += durations[frame]
+
+            widget.show_frame(frame)
+            state[0], state[1] = frame, ends
+            self.frames_rendered += 1
+
+        elapsed = self.clock() - start
+        self.ticks += 1
+        self.total_tick_time += elapsed
+        self.max_tick_time = max(self.max_tick_time, elapsed)
+
+        self._schedule(now)
+
+    def _schedule(self, now: float) -> None:
+        """Set the timer for the end of the earliest frame, unless it's already set for an earlier time."""
+
+        if self._suspended or not self._animations:
+            return
+
+        next_tick = min(ends for _, ends in self._animations.values())
+        if self._next_tick is not None and self._next_tick <= next_tick:
+            return
+
+        self._cancel()
+        self._next_tick = next_tick
+        self._after_id = self.root.after(max(0, round(next_tick - now)), self._tick)
+
+    def _cancel(self) -> None:
+        """Cancel the timer."""
+
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+            self._next_tick = None
+
+    def _suspend(self) -> None:
+        """Stop the timer until the window is mapped again."""
+
+        if self._suspended:
+            return
+
+        self._cancel()
+        self._suspended = True
+        self.running_time += self.clock() - self._running_since
+
+        logger.debug('Animations suspended, stats: %s', self.stats())
+
+    def _resume(self) -> None:
+        """Continue animations from their current frames."""
+
+        if not self._suspended:
+            return
+
+        self._suspended = False
+        self._running_since = self.clock()
+
+        now = self._now()
+        for widget, state in self._animations.items():
+            state[1] = now + widget.durations[state[0]]
+        self._schedule(now)
+
+    def _on_map(self, event: tk.Event) -> None:
+        if event.widget is self.root:
+            self._resume()
+
+    def _on_unmap(self, event: tk.Event) -> None:
+        if event.widget is self.root:
+            self._suspend()
+
+    def stats(self) -> dict:
+        """Get animation stats.
+
+        Returns:
+            dict: Number of running 'animations', 'fps' (frames rendered per second while not suspended),
+                'ticks', 'mean_tick_time' and 'max_tick_time' in seconds.
+        """
+
+        running_time = self.running_time
+        if not self._suspended:
+            running_time += self.clock() - self._running_since
+
+        return {
+            'animations': len(self._animations),
+            'fps': self.frames_rendered / running_time if running_time else 0.0,
+            'ticks': self.ticks,
+            'mean_tick_time': self.total_tick_time / self.ticks if self.ticks else 0.0,
+            'max_tick_time': self.max_tick_time,
+        }
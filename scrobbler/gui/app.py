@@ -6,9 +6,11 @@ import customtkinter as ctk
 
 from config import Config
 from scrobbler import filework
-from scrobbler.logic import Song, run_background, scrobble_at_exit
+from scrobbler.logic import Song, SongSnapshot, run_background, scrobble_at_exit
 from scrobbler.logic.lastfm import Lastfm
+from scrobbler.profiling import SamplingProfiler
 
+from .bridge import TkBridge
 from .frames import LoginFrame, MainFrame, MinimalMainFrame
 from .tray import Tray
 
@@ -22,9 +24,10 @@ class App(ctk.CTk):
         """Initialize the application.
 
         - Configures main window (size, icon, theme, close behavior).
-        - Initializes Last.fm API client and current `Song`.
+        - Initializes Last.fm API client and current `Song`, whose changes are pushed to the main frame.
         - Chooses login or main frame depending on whether user data exists.
         - Starts tray icon in a separate thread.
+        - Starts the sampling profiler if enabled (`Config.PROFILE`).
         - Registers a shutdown hook to scrobble at exit.
         """
 
@@ -42,9 +45,24 @@ class App(ctk.CTk):
         self.login_frame = None
         self.main_frame = None
         self.tray = None
+        self.background_thread = None
+        self.avatar_thread = None
+        self.avatar_requested = False
+        self.avatar_lock = threading.Lock()
 
         self.lastfm = Lastfm()
         self.song = Song()
+        self.song_bridge = TkBridge(self, self._on_song_changed)
+        self.song.subscribe(self.song_bridge.push)
+        self.avatar_bridge = TkBridge(self, self._on_avatar_loaded)
+        self.bind('<Map>', self._on_map, add='+')
+
+        self.profiler = SamplingProfiler(
+            Config.AM_SCROBBLER_DATA_DIR, interval=Config.PROFILE_INTERVAL, memory_interval=Config.PROFILE_MEMORY_INTERVAL
+        )
+        if Config.PROFILE:
+            self.profiler.start()
+        atexit.register(self.profiler.stop)
 
         if filework.user_data_exists():
             is_success = self.lastfm.auth_with_session_key()
@@ -71,19 +89,35 @@ class App(ctk.CTk):
     def show_main_frame(self) -> None:
         """Display the main frame.
 
-        - If minimal GUI is enabled (`Config.MINIMAL_GUI`), show `MinimalMainFrame`, otherwise show full `MainFrame`.
+        - If minimal GUI is enabled (`Config.MINIMAL_GUI`), show `MinimalMainFrame`, otherwise show full `MainFrame`
+          with the avatar saved on disk (or a placeholder). A missing or stale avatar is fetched in the background.
         - Starts background thread for scrobbling logic.
         """
 
         if Config.MINIMAL_GUI:
             self.main_frame = MinimalMainFrame(self, self.song, self.lastfm)
         else:
+            is_avatar_fresh = self.lastfm.load_cached_avatar()
             self.main_frame = MainFrame(self, self.song, self.lastfm)
+            if not is_avatar_fresh:
+                self.start_avatar_thread()
 
         self.start_background_thread()
 
     def start_background_thread(self) -> None:
-        threading.Thread(target=self._run_background_with_error_handling, daemon=True).start()
+        # After relogin the running loop is kept, it uses the same `Lastfm` with the new session
+        if self.background_thread is None or not self.background_thread.is_alive():
+            # Named, so the sampling profiler can find it
+            self.background_thread = threading.Thread(target=self._run_background_with_error_handling, name='background', daemon=True)
+            self.background_thread.start()
+
+    def start_avatar_thread(self) -> None:
+        # A running thread picks up the request when its current fetch is done (e.g. one started before relogin)
+        with self.avatar_lock:
+            self.avatar_requested = True
+            if self.avatar_thread is None:
+                self.avatar_thread = threading.Thread(target=self._fetch_avatar, daemon=True)
+                self.avatar_thread.start()
 
     def start_tray_icon_thread(self) -> None:
         self.tray = Tray(self)
@@ -102,6 +136,49 @@ class App(ctk.CTk):
             force_auth_without_sk = 'Invalid session key' in str(e)
             self.after(0, self._update_gui_on_error, force_auth_without_sk)
 
+    def _fetch_avatar(self) -> None:
+        """Fetch the user's avatar and pass it to the main frame. Runs on the avatar thread.
+
+        Fetches again while new fetches are requested, or if another user logged in during the fetch.
+        """
+
+        while True:
+            with self.avatar_lock:
+                if not self.avatar_requested:
+                    self.avatar_thread = None
+                    return
+                self.avatar_requested = False
+
+            username = self.lastfm.username
+            is_success = self.lastfm.set_avatar()
+            if self.lastfm.username != username:
+                with self.avatar_lock:
+                    self.avatar_requested = True
+            elif is_success:
+                self.avatar_bridge.push((username, self.lastfm.avatar))
+
+    def _on_avatar_loaded(self, user_avatar: tuple) -> None:
+        """Replace the avatar shown in the main frame with the fetched one, unless it's of a previous user."""
+
+        username, avatar = user_avatar
+        if username != self.lastfm.username:
+            return
+
+        if isinstance(self.main_frame, MainFrame) and self.main_frame.winfo_exists():
+            self.main_frame.set_avatar(avatar)
+
+    def _on_song_changed(self, song: SongSnapshot) -> None:
+        """Pass a new snapshot of the song to the main frame."""
+
+        if self.main_frame is not None and self.main_frame.winfo_exists():
+            self.main_frame.show_song(song)
+
+    def _on_map(self, event) -> None:
+        """Show changes of the song made while the window was minimized."""
+
+        if event.widget is self and self.main_frame is not None and self.main_frame.winfo_exists():
+            self.main_frame.show_song(self.song.snapshot, force=True)
+
     def _update_gui_on_error(self, force_auth_without_sk: bool) -> None:
         """Destroy main frame and return to login frame after an error."""
 
@@ -115,22 +192,15 @@ class App(ctk.CTk):
             self.login_frame.destroy()
         self.show_main_frame()
 
-    def withdraw(self) -> None:
-        """Stop animating GIFs when window is withdrawn."""
-
-        if not Config.MINIMAL_GUI and self.main_frame is not None and self.main_frame.winfo_exists():
-            self.main_frame.stop_all_animations()
+    def deiconify(self) -> None:
+        """Show changes of the song made while hidden when window becomes visible.
 
-        return super().withdraw()
+        GIFs don't need to be handled, the animation clock suspends them while the window isn't viewable.
+        """
 
-    def deiconify(self) -> None:
-        """Show GIFs when window becomes visible."""
+        result = super().deiconify()
 
-        if not Config.MINIMAL_GUI and self.main_frame is not None and self.main_frame.winfo_exists():
-            if self.song.metadata.get('playing'):
-                self.main_frame.show_play_gif()
-            else:
-                self.main_frame.show_pause_gif()
-            self.main_frame.show_avatar_gif()
+        if self.main_frame is not None and self.main_frame.winfo_exists():
+            self.main_frame.show_song(self.song.snapshot, force=True)
 
-        return super().deiconify()
+        return result
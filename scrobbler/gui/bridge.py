@@ -0,0 +1,72 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable
+
+
+class TkBridge:
+    """Hands values pushed from background threads over to a callback on the Tk thread.
+
+    Values are put into a thread-safe queue and the Tk main loop is woken up with a single virtual event.
+    While that event is pending, further pushes only add to the queue, and the callback is called once
+    with the latest value. So Tk is only woken up on real changes, and never more than once per change burst.
+    """
+
+    EVENT = '<<BridgeUpdate>>'
+
+    def __init__(self, root: tk.Misc, callback: Callable[[Any], None]):
+        """Bind the bridge to the Tk root window.
+
+        Args:
+            root (tk.Misc): Tk root window.
+            callback (Callable[[Any], None]): Called on the Tk thread with the latest pushed value.
+        """
+
+        self.root = root
+        self.callback = callback
+
+        self._queue = queue.SimpleQueue()
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+        root.bind(self.EVENT, self._drain, add='+')
+
+        # Values pushed before the main loop started are delivered as soon as it runs
+        root.after_idle(self._drain)
+
+    def push(self, value: Any) -> None:
+        """Queue a value for the callback. Can be called from any thread.
+
+        Args:
+            value (Any): Value to pass to the callback.
+        """
+
+        self._queue.put(value)
+
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+
+        try:
+            self.root.event_generate(self.EVENT, when='tail')
+        except (RuntimeError, tk.TclError):
+            # Main loop isn't running (yet or anymore), the value waits for the next push or the initial drain
+            with self._lock:
+                self._scheduled = False
+
+    def _drain(self, event: tk.Event | None = None) -> None:
+        """Call the callback with the latest queued value. Runs on the Tk thread."""
+
+        with self._lock:
+            self._scheduled = False
+
+        value = empty = object()
+        while True:
+            try:
+                value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+        if value is not empty:
+            self.callback(value)
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import re
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple
+
+import customtkinter as ctk
+from PIL import Image, ImageSequence, PngImagePlugin, UnidentifiedImageError
+
+from config import Config
+from scrobbler.utils import make_circle
+
+logger = logging.getLogger(__name__)
+
+# Duration of a GIF frame in ms, if the GIF doesn't specify one
+DEFAULT_FRAME_DURATION = 100
+
+
+class GIFFrames(NamedTuple):
+    """Frames of a GIF ready to be displayed."""
+
+    images: tuple[ctk.CTkImage, ...]
+    durations: tuple[int, ...]
+
+
+class FrameCache:
+    """Process-wide cache of GIF frames shared by all `GIFLabel`s.
+
+    Frames are decoded, cropped and resized to the size they are displayed at once per (source, size, crop),
+    so rebuilding a frame (e.g., after relogin) costs nothing. The `CTkImage`s are shared too, and so are the
+    Tk photo images they create.
+
+    Frames of GIF files can also be saved to disk as a sprite sheet: a single PNG with all frames stacked vertically,
+    which is decoded much faster than the GIF on later launches.
+    """
+
+    def __init__(self, directory: Path | None = None):
+        """Initialize the cache.
+
+        Args:
+            directory (Path | None, optional): Directory for sprite sheets, or None to keep frames only in memory.
+                Defaults to None.
+        """
+
+        self.directory = directory
+        self._entries = {}
+
+    def get(self, source: str | Image.Image, size: tuple[int, int], scaling: float = 1.0, crop_circle: bool = False) -> GIFFrames:
+        """Get frames of a GIF.
+
+        Args:
+            source (str | Image.Image): Path to a GIF file or an opened GIF.
+            size (tuple[int, int]): Size the frames are displayed at.
+            scaling (float, optional): Widget scaling (DPI), frames are rendered at `size * scaling`. Defaults to 1.0.
+            crop_circle (bool, optional): Whether to crop frames into a circle. Defaults to False.
+
+        Returns:
+            GIFFrames: Frames and their durations in ms.
+        """
+
+        pixel_size = (round(size[0] * scaling), round(size[1] * scaling))
+
+        if isinstance(source, str):
+            key = (source, pixel_size, crop_circle)
+        else:
+            # Opened images are cached by identity, and kept in the entry so the identity can't be reused
+            key = (id(source), pixel_size, crop_circle)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            frames, durations = self._load(source, pixel_size, crop_circle)
+            images = tuple(ctk.CTkImage(frame, size=size) for frame in frames)
+            entry = self._entries[key] = (source, GIFFrames(images, durations))
+
+        return entry[1]
+
+    def _load(self, source: str | Image.Image, size: tuple[int, int], crop_circle: bool) -> tuple[list[Image.Image], tuple[int, ...]]:
+        """Get rendered frames from a sprite sheet, or render them from the GIF."""
+
+        if not isinstance(source, str):
+            return self._render(source, size, crop_circle)
+
+        if self.directory is None:
+            with Image.open(source) as gif:
+                return self._render(gif, size, crop_circle)
+
+        with open(source, 'rb') as file:
+            data = file.read()
+
+        sprite_path = self._sprite_path(source, data, size, crop_circle)
+        loaded = self._load_sprite(sprite_path, size)
+        if loaded is not None:
+            return loaded
+
+        with Image.open(BytesIO(data)) as gif:
+            frames, durations = self._render(gif, size, crop_circle)
+
+        self._save_sprite(sprite_path, frames, durations)
+
+        return frames, durations
+
+    def _render(self, gif: Image.Image, size: tuple[int, int], crop_circle: bool) -> tuple[list[Image.Image], tuple[int, ...]]:
+        """Decode all frames of the GIF, crop and resize them."""
+
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(gif):
+            rendered = make_circle(frame) if crop_circle else frame.convert('RGBA')
+            frames.append(rendered.resize(size))
+            durations.append(int(frame.info.get('duration') or DEFAULT_FRAME_DURATION))
+
+        return frames, tuple(durations)
+
+    def _sprite_path(self, path: str, data: bytes, size: tuple[int, int], crop_circle: bool) -> Path:
+        """Get path of the sprite sheet for a GIF file, it changes when the content of the file does.
+
+        Location and mtime of the file aren't used: a PyInstaller one-file build extracts assets to a new temporary
+        directory on every launch.
+        """
+
+        version = hashlib.sha1(data).hexdigest()[:16]
+        return self.directory / f'{Path(path).stem}-{size[0]}x{size[1]}{"-circle" if crop_circle else ""}-{version}.png'
+
+    def _load_sprite(self, path: Path, size: tuple[int, int]) -> tuple[list[Image.Image], tuple[int, ...]] | None:
+        """Cut a sprite sheet into frames."""
+
+        try:
+            with Image.open(path) as sprite:
+                sprite.load()
+                durations = tuple(int(duration) for duration in sprite.info['durations'].split(','))
+        except FileNotFoundError:
+            return None
+        except (OSError, UnidentifiedImageError, KeyError, ValueError):
+            logger.warning("Couldn't load GIF sprite sheet, path: %s", path, exc_info=True)
+            return None
+
+        w, h = size
+        if sprite.size != (w, h * len(durations)):
+            return None
+
+        frames = [sprite.crop((0, i * h, w, (i + 1) * h)) for i in range(len(durations))]
+        return frames, durations
+
+    def _save_sprite(self, path: Path, frames: list[Image.Image], durations: tuple[int, ...]) -> None:
+        """Save frames as a sprite sheet, replacing sheets of older versions of the GIF."""
+
+        w, h = frames[0].size
+        sprite = Image.new('RGBA', (w, h * len(frames)))
+        for i, frame in enumerate(frames):
+            sprite.paste(frame, (0, i * h))
+
+        info = PngImagePlugin.PngInfo()
+        info.add_text('durations', ','.join(map(str, durations)))
+
+        tmp_path = path.with_suffix('.tmp')
+        # Sheets of the same GIF, size and crop differ only in the version, e.g. 'play-60x60' doesn't match 'play-60x60-circle-...'
+        prefix = path.stem.rsplit('-', 1)[0]
+        old_name = re.compile(re.escape(prefix) + r'-[0-9a-f]{16}\.png')
+
+        try:
+            for old_path in path.parent.glob(f'{prefix}-*.png'):
+                if old_name.fullmatch(old_path.name):
+                    old_path.unlink()
+            sprite.save(tmp_path, format='PNG', pnginfo=info)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Couldn't save GIF sprite sheet, path: %s", path, exc_info=True)
+
+
+# Shared by all `GIFLabel`s
+frame_cache = FrameCache(Config.FRAME_CACHE_DIR if Config.FRAME_CACHE_ON_DISK else None)
@@ -4,11 +4,12 @@ import customtkinter as ctk
 from PIL import Image
 
 from scrobbler import filework
-from scrobbler.logic import Song
+from scrobbler.logic import Song, SongSnapshot
 from scrobbler.logic.lastfm import Lastfm
-from scrobbler.utils import is_gif, truncate_text
+from scrobbler.utils import is_gif
 
 from ..constants import Colors, Font
+from ..now_playing import ArtworkImageCache, NowPlayingView
 from ..widgets import GIFLabel
 from .login_frame import LoginFrame
 
@@ -22,7 +23,7 @@ class MainFrame(ctk.CTkFrame):
         - Animated GIFs indicating play/pause state.
         - Song metadata (artwork, title, and artist).
 
-    Dynamically updates to reflect changes in song metadata.
+    Updates when `show_song()` is called with a new snapshot of the song.
     """
 
     def __init__(self, master, song: Song, lastfm: Lastfm):
@@ -37,7 +38,7 @@ class MainFrame(ctk.CTkFrame):
         - Create relogin button.
         - Creates play/pause labels with animated GIFs to indicate play/pause state.
         - Creates title/artist labels for now playing info.
-        - Starts periodic updates.
+        - Displays the current song.
         """
 
         super().__init__(master)
@@ -55,21 +56,8 @@ class MainFrame(ctk.CTkFrame):
         self.user_header_frame.grid(row=0, column=0, pady=(0, 55), sticky='ne')
         self.user_header_frame.grid_columnconfigure(0, weight=1)
 
-        img_w, img_h = 40, 40
-        if not lastfm.avatar:
-            img = Image.open(filework.get_image_path('placeholder_avatar.png'))
-            avatar_image = ctk.CTkImage(img, size=(img_w, img_h))
-            self.avatar_image_label = ctk.CTkLabel(self.user_header_frame, image=avatar_image, text='', cursor='hand2')
-        elif is_gif(lastfm.avatar):
-            self.avatar_image_label = GIFLabel(
-                self.user_header_frame, lastfm.avatar, crop_circle=True, width=img_w - 7, height=img_h - 7, text='', cursor='hand2'
-            )
-        else:
-            avatar_image = ctk.CTkImage(lastfm.avatar, size=(img_w, img_h))
-            self.avatar_image_label = ctk.CTkLabel(self.user_header_frame, image=avatar_image, text='', cursor='hand2')
-
-        self.avatar_image_label.grid(row=0, column=1, padx=(15, 10), pady=(5, 5), sticky='nsew')
-        self.avatar_image_label.bind('<Button-1>', lambda event: webbrowser.open(lastfm.user_url))
+        self.avatar_image_label = None
+        self.set_avatar(lastfm.avatar)
 
         self.user_font = ctk.CTkFont(family=Font.FAMILY, size=Font.SIZE_MEDIUM)
         self.user_label = ctk.CTkLabel(
@@ -100,13 +88,11 @@ class MainFrame(ctk.CTkFrame):
         self.gif_frame.grid_columnconfigure(0, weight=1)
         self.gif_frame.grid_rowconfigure(0, weight=1)
 
-        with Image.open(filework.get_image_path('pause.gif')) as pause_gif:
-            self.pause_gif = GIFLabel(self.gif_frame, pause_gif)
+        self.pause_gif = GIFLabel(self.gif_frame, filework.get_image_path('pause.gif'))
         self.pause_gif.grid(row=0, column=0)
         self.pause_gif.grid_remove()
 
-        with Image.open(filework.get_image_path('play.gif')) as play_gif:
-            self.play_gif = GIFLabel(self.gif_frame, play_gif, width=200, height=100)
+        self.play_gif = GIFLabel(self.gif_frame, filework.get_image_path('play.gif'), width=200, height=100)
         self.play_gif.grid(row=0, column=0, pady=(30, 0))
         self.play_gif.grid_remove()
 
@@ -117,7 +103,7 @@ class MainFrame(ctk.CTkFrame):
 
         self.artwork_image_label = ctk.CTkLabel(self.song_frame, text='')
         self.artwork_image_label.grid(row=0, column=0, rowspan=2, padx=(5, 5), pady=(5, 5), sticky='e')
-        self.placeholder_artwork = filework.load_image('placeholder_artwork.jpg')
+        self.artwork_images = ArtworkImageCache((50, 50), filework.load_image('placeholder_artwork.jpg'))
 
         self.title_font = ctk.CTkFont(family=Font.FAMILY, size=Font.SIZE_MEDIUM, weight='bold')
         self.title_label = ctk.CTkLabel(self.song_frame, text='No music((', font=self.title_font)
@@ -127,63 +113,84 @@ class MainFrame(ctk.CTkFrame):
         self.artist_label = ctk.CTkLabel(self.song_frame, text='', font=self.artist_font, text_color=Colors.GRAY)
         self.artist_label.grid(row=1, column=1, padx=(0, 5), sticky='we')
 
-        self._update_now_playing()
+        self.displayed_song = None
+        self.displayed_view = None
+        self.show_song(song.snapshot, force=True)
 
-    def _update_now_playing(self, prev_id: str = '', is_prev_playing: bool = False, prev_artwork: Image.Image = None) -> None:
-        """Update displayed song info if app is visible and metadata changed.
+    def set_avatar(self, avatar: Image.Image | None) -> None:
+        """Display the user's avatar, replacing the one displayed before.
 
-        Triggers re-render when:
-            - Song ID changes (new track). Defaults to ''.
-            - Play/pause state changes. Defaults to False.
-            - Artwork changes (artwork can arrive later than title/artist). Defaults to None.
+        Args:
+            avatar (Image.Image | None): Avatar already cropped into a circle, or None to display a placeholder.
+        """
+
+        img_w, img_h = 40, 40
+        if not avatar:
+            img = Image.open(filework.get_image_path('placeholder_avatar.png'))
+            avatar_image = ctk.CTkImage(img, size=(img_w, img_h))
+            avatar_image_label = ctk.CTkLabel(self.user_header_frame, image=avatar_image, text='', cursor='hand2')
+        elif is_gif(avatar):
+            avatar_image_label = GIFLabel(self.user_header_frame, avatar, width=img_w - 7, height=img_h - 7, text='', cursor='hand2')
+        else:
+            avatar_image = ctk.CTkImage(avatar, size=(img_w, img_h))
+            avatar_image_label = ctk.CTkLabel(self.user_header_frame, image=avatar_image, text='', cursor='hand2')
+
+        avatar_image_label.grid(row=0, column=1, padx=(15, 10), pady=(5, 5), sticky='nsew')
+        avatar_image_label.bind('<Button-1>', lambda event: webbrowser.open(self.lastfm.user_url))
+
+        if self.avatar_image_label is not None:
+            self.avatar_image_label.destroy()
+
+        self.avatar_image_label = avatar_image_label
+
+    def show_song(self, song: SongSnapshot, force: bool = False) -> None:
+        """Display a snapshot of the song if the window is visible.
+
+        A new snapshot is published when:
+            - Song ID changes (new track).
+            - Play/pause state changes.
+            - Title, artist or artwork change (they can arrive later from Apple Music web and Last.fm).
 
         Args:
-            prev_id (str): Previously displayed song ID.
-            is_prev_playing (bool): Previous play state.
-            prev_artwork (Image.Image): Previously displayed artwork image.
+            song (SongSnapshot): Snapshot to display.
+            force (bool, optional): Display even if the window is not visible (yet). Defaults to False.
         """
 
-        if self.winfo_ismapped() and (
-            self.song.metadata['id'] != prev_id
-            or self.song.metadata['playing'] != is_prev_playing
-            or self.song.metadata['artwork'] != prev_artwork
-        ):
-            if self.song.metadata['playing']:
-                self.show_play_gif()
+        if song is not self.displayed_song and (force or self.winfo_viewable()):
+            self.displayed_song = song
 
-                self.song_frame.configure(fg_color=Colors.DARK_GRAY)
+            artwork = self.artwork_images.get(song.id, song.artwork) if song.playing else None
+            self._show_view(NowPlayingView.from_snapshot(song, 30, 33, artwork))
 
-                artwork = self.song.metadata['artwork'] if self.song.metadata['artwork'] is not None else self.placeholder_artwork
-                artwork_image = ctk.CTkImage(artwork, size=(50, 50))
-                self.artwork_image_label.configure(image=artwork_image)
-                self.artwork_image_label.grid()
+    def _show_view(self, view: NowPlayingView) -> None:
+        """Update only the widgets whose content differs from the displayed view."""
 
-                self.title_font.configure(size=Font.SIZE_SMALL)
-                self.title_label.configure(text=truncate_text(self.song.metadata['title'], 30))
+        old = self.displayed_view
+        self.displayed_view = view
 
-                self.artist_label.configure(text=truncate_text(self.song.metadata['artist'], 33))
+        if old is None or view.playing != old.playing:
+            if view.playing:
+                self.show_play_gif()
+                self.song_frame.configure(fg_color=Colors.DARK_GRAY)
+                self.title_font.configure(size=Font.SIZE_SMALL)
+                self.artwork_image_label.grid()
                 self.artist_label.grid()
-            elif self.play_gif.winfo_manager():
+            else:
                 self.show_pause_gif()
-
                 self.song_frame.configure(fg_color='transparent')
                 self.title_font.configure(size=Font.SIZE_MEDIUM)
-                self.title_label.configure(text='No music((')
-
                 self.artist_label.grid_remove()
                 self.artwork_image_label.grid_remove()
 
-        if self.winfo_exists():
-            if self.winfo_ismapped():
-                self.after(
-                    1000,
-                    self._update_now_playing,
-                    self.song.metadata['id'],
-                    self.song.metadata['playing'],
-                    self.song.metadata['artwork'],
-                )
-            else:
-                self.after(1000, self._update_now_playing, prev_id, is_prev_playing, prev_artwork)
+        if old is None or view.title != old.title:
+            self.title_label.configure(text=view.title)
+
+        if old is None or view.artist != old.artist:
+            self.artist_label.configure(text=view.artist)
+
+        # Hidden artwork is kept as is, so resuming the same track doesn't touch it
+        if view.artwork is not None and view.artwork is not self.artwork_image_label.cget('image'):
+            self.artwork_image_label.configure(image=view.artwork)
 
     def show_pause_gif(self) -> None:
         """Display the pause GIF if not already displayed and hide the play GIF."""
@@ -199,19 +206,6 @@ class MainFrame(ctk.CTkFrame):
             self.pause_gif.grid_remove()
             self.play_gif.grid()
 
-    def show_avatar_gif(self) -> None:
-        """Display avatar if not already displayed."""
-
-        if not self.avatar_image_label.winfo_manager():
-            self.avatar_image_label.grid()
-
-    def stop_all_animations(self) -> None:
-        """Hide all GIFs."""
-
-        self.play_gif.grid_remove()
-        self.pause_gif.grid_remove()
-        self.avatar_image_label.grid_remove()
-
     def _relogin(self, event) -> None:
         """Destroy main frame and open login frame on `relogin` button click."""
 
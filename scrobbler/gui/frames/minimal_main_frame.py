@@ -4,11 +4,11 @@ import customtkinter as ctk
 from PIL import Image
 
 from scrobbler.filework import get_image_path
-from scrobbler.logic import Song
+from scrobbler.logic import Song, SongSnapshot
 from scrobbler.logic.lastfm import Lastfm
-from scrobbler.utils import truncate_text
 
 from ..constants import Colors, Font
+from ..now_playing import NowPlayingView
 from .login_frame import LoginFrame
 
 
@@ -18,7 +18,7 @@ class MinimalMainFrame(ctk.CTkFrame):
     A lightweight alternative to the full main frame:
     - Shows Last.fm username (clickable, links to profile).
     - Displays current track title and artist if playing.
-    - Updates every second to reflect playback status.
+    - Updates when `show_song()` is called with a new snapshot of the song.
     """
 
     def __init__(self, master, song: Song, lastfm: Lastfm):
@@ -32,7 +32,7 @@ class MinimalMainFrame(ctk.CTkFrame):
         - Builds user header with username (clickable link).
         - Create relogin button.
         - Creates title/artist labels for now playing info.
-        - Starts periodic updates.
+        - Displays the current song.
         """
 
         super().__init__(master)
@@ -82,50 +82,55 @@ class MinimalMainFrame(ctk.CTkFrame):
         self.song_frame.grid(row=1, column=0, sticky='new')
         self.song_frame.grid_columnconfigure(0, weight=1)
 
-        self.pause_text = 'No music(('
         self.title_font = ctk.CTkFont(family=Font.FAMILY, size=Font.SIZE_MEDIUM, weight='bold')
-        self.title_label = ctk.CTkLabel(self.song_frame, text=self.pause_text, font=self.title_font)
+        self.title_label = ctk.CTkLabel(self.song_frame, text='No music((', font=self.title_font)
         self.title_label.grid(row=0, column=0, padx=(0, 5), pady=(10, 0), sticky='we')
 
         self.artist_font = ctk.CTkFont(family=Font.FAMILY, size=Font.SIZE_SMALL)
         self.artist_label = ctk.CTkLabel(self.song_frame, text='', font=self.artist_font, text_color=Colors.GRAY)
         self.artist_label.grid(row=1, column=0, padx=(0, 5), sticky='we')
 
-        self._update_now_playing()
+        self.displayed_song = None
+        self.displayed_view = None
+        self.show_song(song.snapshot, force=True)
 
-    def _update_now_playing(self, prev_id: str = '', is_prev_playing: bool = False) -> None:
-        """Update displayed song info if app is visible and track or play status changed.
+    def show_song(self, song: SongSnapshot, force: bool = False) -> None:
+        """Display a snapshot of the song if the window is visible.
 
         Args:
-            prev_id (str): ID of previously displayed song. Defaults to ''.
-            is_prev_playing (bool): Whether the song was previously marked as playing. Defaults to False.
+            song (SongSnapshot): Snapshot to display.
+            force (bool, optional): Display even if the window is not visible (yet). Defaults to False.
 
         Behavior:
             - If a new song starts, update title and artist.
             - If playback stops, show pause message.
-            - Reschedules itself every 1s with `after()`.
         """
 
-        if self.winfo_ismapped() and (self.song.metadata['id'] != prev_id or self.song.metadata['playing'] != is_prev_playing):
-            if self.song.metadata['playing']:
+        if song is not self.displayed_song and (force or self.winfo_viewable()):
+            self.displayed_song = song
+            self._show_view(NowPlayingView.from_snapshot(song, 38, 41))
+
+    def _show_view(self, view: NowPlayingView) -> None:
+        """Update only the widgets whose content differs from the displayed view."""
+
+        old = self.displayed_view
+        self.displayed_view = view
+
+        if old is None or view.playing != old.playing:
+            if view.playing:
                 self.title_font.configure(size=Font.SIZE_SMALL)
-                self.title_label.configure(text=truncate_text(self.song.metadata['title'], 38))
                 self.title_label.grid_configure(pady=(0, 0))
-
-                self.artist_label.configure(text=truncate_text(self.song.metadata['artist'], 41))
                 self.artist_label.grid()
-            elif self.title_label.cget('text') != self.pause_text:
+            else:
                 self.title_font.configure(size=Font.SIZE_MEDIUM)
-                self.title_label.configure(text=self.pause_text)
                 self.title_label.grid_configure(pady=(10, 0))
-
                 self.artist_label.grid_remove()
 
-        if self.winfo_exists():
-            if self.winfo_ismapped():
-                self.after(1000, self._update_now_playing, self.song.metadata['id'], self.song.metadata['playing'])
-            else:
-                self.after(1000, self._update_now_playing, prev_id, is_prev_playing)
+        if old is None or view.title != old.title:
+            self.title_label.configure(text=view.title)
+
+        if old is None or view.artist != old.artist:
+            self.artist_label.configure(text=view.artist)
 
     def _relogin(self, event) -> None:
         """Destroy main frame and open login frame on `relogin` button click."""
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import NamedTuple
+
+import customtkinter as ctk
+from PIL import Image
+
+from scrobbler.logic import SongSnapshot
+from scrobbler.metrics import registry
+from scrobbler.utils import truncate_text
+
+
+class NowPlayingView(NamedTuple):
+    """Content of the now playing widgets, derived from a song snapshot.
+
+    Frames compare it with the previously displayed view and only update widgets whose content changed.
+    """
+
+    playing: bool
+    title: str
+    artist: str
+    artwork: ctk.CTkImage | None = None
+
+    @classmethod
+    def from_snapshot(
+        cls, song: SongSnapshot, title_chars: int, artist_chars: int, artwork: ctk.CTkImage | None = None
+    ) -> 'NowPlayingView':
+        """Build a view of the song.
+
+        Args:
+            song (SongSnapshot): Snapshot of the song.
+            title_chars (int): Max length of the displayed title.
+            artist_chars (int): Max length of the displayed artist.
+            artwork (ctk.CTkImage | None, optional): Artwork to display while the song is playing. Defaults to None.
+
+        Returns:
+            NowPlayingView: View of the playing song, or of no music if it's paused.
+        """
+
+        if not song.playing:
+            return cls(False, 'No music((', '')
+        return cls(True, truncate_text(song.title, title_chars), truncate_text(song.artist, artist_chars), artwork)
+
+
+class ArtworkImageCache:
+    """LRU of ready-to-display artwork `CTkImage`s by track ID.
+
+    A `CTkImage` keeps the Tk photo images it renders, so switching back to a recently played track reuses them
+    instead of scaling and encoding the artwork again.
+    """
+
+    def __init__(self, size: tuple[int, int], placeholder: Image.Image, max_entries: int = 32):
+        """Initialize the cache.
+
+        Args:
+            size (tuple[int, int]): Size the artwork is displayed at.
+            placeholder (Image.Image): Artwork displayed for tracks without one.
+            max_entries (int, optional): Max number of cached images. Defaults to 32.
+        """
+
+        self.size = size
+        self.max_entries = max_entries
+        self.placeholder = ctk.CTkImage(placeholder, size=size)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._images = OrderedDict()
+
+        registry.register_collector('artwork_images', lambda: {'hits': self.hits, 'misses': self.misses, 'size': len(self._images)})
+
+    def get(self, track_id: str, artwork: Image.Image | None) -> ctk.CTkImage:
+        """Get the image of a track's artwork.
+
+        Args:
+            track_id (str): ID of the track.
+            artwork (Image.Image | None): Artwork of the track (decoded again every time the track is played,
+                so it's cached by the track), or None if there is none.
+
+        Returns:
+            ctk.CTkImage: Image of the artwork, or of the placeholder.
+        """
+
+        if artwork is None:
+            return self.placeholder
+
+        image = self._images.get(track_id)
+        if image is not None:
+            self._images.move_to_end(track_id)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._images[track_id] = ctk.CTkImage(artwork, size=self.size)
+        if len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+
+        return image
@@ -4,7 +4,7 @@ from scrobbler import filework
 
 
 class Tray:
-    """System tray icon with a context menu that allows the user to open the main window or quit the application."""
+    """System tray icon with a context menu that allows the user to open the main window, toggle profiling or quit the application."""
 
     def __init__(self, master):
         self.master = master
@@ -12,6 +12,7 @@ class Tray:
         image = filework.load_image('main_icon.png')
         menu = pystray.Menu(
             pystray.MenuItem(text='Open', action=self.show_window, default=True),
+            pystray.MenuItem(text='Profiling', action=self.toggle_profiling, checked=lambda item: self.master.profiler.running),
             pystray.MenuItem(text='Quit', action=self.on_tray_quit),
         )
         self.icon = pystray.Icon('AMScrobbler', image, 'AMScrobbler', menu)
@@ -21,6 +22,15 @@ class Tray:
 
         self.master.deiconify()
 
+    def toggle_profiling(self, icon=None, item=None) -> None:
+        """Start or stop the sampling profiler, stopping writes out what it collected."""
+
+        profiler = self.master.profiler
+        if profiler.running:
+            profiler.stop()
+        else:
+            profiler.start()
+
     def on_tray_quit(self, icon, item=None) -> None:
         """Quit the application via tray menu. Stops the tray icon loop and terminates the main application."""
 
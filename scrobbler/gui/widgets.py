@@ -1,51 +1,69 @@
 import customtkinter as ctk
 from PIL import Image
 
-from scrobbler.utils import make_circle
+from .animation import AnimationClock
+from .frame_cache import frame_cache
 
 
 class GIFLabel(ctk.CTkLabel):
-    """A label widget that displays and animates a GIF image frame by frame."""
+    """A label widget that displays and animates a GIF image frame by frame.
 
-    def __init__(self, master, gif: Image.Image, crop_circle: bool = False, **kwargs):
-        kwargs.setdefault('width', gif.width)
-        kwargs.setdefault('height', gif.height)
-        kwargs.setdefault('text', '')
-
-        super().__init__(master, **kwargs)
+    Frames come from the shared `frame_cache`, so they are only rendered once per process, and are advanced by
+    the window's `AnimationClock` while the label is gridded.
+    """
 
-        self.gif = gif
-        self.crop_circle = crop_circle
-        self.duration = gif.info['duration']
-        self.frames = []
-        self._set_frames()
+    def __init__(self, master, gif: str | Image.Image, crop_circle: bool = False, **kwargs):
+        """Initialize the label.
 
-    def _set_frames(self) -> None:
-        """Extract all frames of the GIF and store them as CTkImages."""
+        Args:
+            master: Parent widget.
+            gif (str | Image.Image): Path to a GIF file or an opened GIF (e.g., animated avatar).
+            crop_circle (bool, optional): Whether to crop frames into a circle. Defaults to False.
+            **kwargs: Arguments for `CTkLabel`, `width` and `height` default to the size of the GIF.
+        """
 
-        for frame in range(self.gif.n_frames):
-            self.gif.seek(frame)
-            if self.crop_circle:
-                self.frames.append(ctk.CTkImage(make_circle(self.gif).copy(), size=(self['width'], self['height'])))
+        if 'width' not in kwargs or 'height' not in kwargs:
+            if isinstance(gif, str):
+                # Only the header is read
+                with Image.open(gif) as img:
+                    size = img.size
             else:
-                self.frames.append(ctk.CTkImage(self.gif.copy(), size=(self['width'], self['height'])))
+                size = gif.size
+            kwargs.setdefault('width', size[0])
+            kwargs.setdefault('height', size[1])
+        kwargs.setdefault('text', '')
+
+        super().__init__(master, **kwargs)
 
-    def _animate(self, frame: int = 0) -> None:
-        """Display the given GIF frame and schedule the next one.
+        self.frames, self.durations = frame_cache.get(
+            gif, (self['width'], self['height']), scaling=self._get_widget_scaling(), crop_circle=crop_circle
+        )
 
-        Args:
-            frame (int, optional): Index of the frame to display. Defaults to 0.
+    def show_frame(self, frame: int) -> None:
+        """Display the given GIF frame. Called by the animation clock.
 
-        Notes:
-            This method re-calls itself with `after()` to create a continuous animation loop while the widget is managed.
+        Args:
+            frame (int): Index of the frame to display.
         """
 
         self.configure(image=self.frames[frame])
-        if self.winfo_manager():
-            self.after(self.duration, self._animate, (frame + 1) % len(self.frames))
 
     def grid(self, **kwargs) -> None:
-        """Start animation after dispalying GIF."""
+        """Start animation after displaying GIF."""
 
         super().grid(**kwargs)
-        self._animate()
+        AnimationClock.of(self).start(self)
+
+    def grid_remove(self) -> None:
+        """Stop animation after hiding GIF."""
+
+        AnimationClock.of(self).stop(self)
+        super().grid_remove()
+
+    def destroy(self) -> None:
+        """Stop animation and unregister from the shared frame image, so it doesn't keep the destroyed label alive."""
+
+        AnimationClock.of(self).stop(self)
+        if isinstance(self._image, ctk.CTkImage):
+            self._image.remove_configure_callback(self._update_image)
+        super().destroy()
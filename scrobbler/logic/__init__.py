@@ -1,4 +1,5 @@
+from .engine import ScrobbleEngine
 from .main_logic import run_background, scrobble_at_exit
-from .song import Song
+from .song import Song, SongSnapshot
 
-__all__ = ['run_background', 'scrobble_at_exit', 'Song']
+__all__ = ['run_background', 'scrobble_at_exit', 'ScrobbleEngine', 'Song', 'SongSnapshot']
@@ -1,4 +1,12 @@
-from .app_scraper import AppScraper
-from .web_scraper import WebScraper
+import importlib
 
-__all__ = ['AppScraper', 'WebScraper']
+__all__ = ['AppScraper', 'AsyncWebScraper', 'WebScraper']
+
+# Scrapers are imported on first access, so the web scrapers can be used without `pywinauto` (Windows only)
+_MODULES = {'AppScraper': '.app_scraper', 'AsyncWebScraper': '.async_web_scraper', 'WebScraper': '.web_scraper'}
+
+
+def __getattr__(name: str):
+    if name in _MODULES:
+        return getattr(importlib.import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,35 +1,92 @@
-from pywinauto import Application
-from pywinauto.findwindows import ElementAmbiguousError, ElementNotFoundError
+import logging
+import time
 
-from scrobbler.utils import convert_time_to_seconds, get_process_id
+from comtypes import COMError
+from pywinauto.controls.uiawrapper import UIAWrapper
+from pywinauto.findwindows import ElementNotFoundError, find_elements
+
+from scrobbler.metrics import timed
+from scrobbler.utils import convert_time_to_seconds
 
 from ..song import Song
+from .process_tracker import ProcessTracker
+
+logger = logging.getLogger(__name__)
 
 
 class AppScraper:
     """Scraper for Apple Music Windows desktop app.
 
     Uses `pywinauto` to connect to the app window, extract metadata and update the `Song` object.
+
+    UI elements are looked up without waiting (a missing element fails right away instead of after `pywinauto`'s
+    default timeouts), and their wrappers are cached per window, so a poll only re-reads their texts. The cache is
+    dropped when an element is missing, and the window is looked up again when an element turns out to be stale.
     """
 
     def __init__(self):
         self.main_window = None
+        self._elements = {}
+        self.process_tracker = ProcessTracker('AppleMusic.exe')
+
+        self.polls = 0
+        self.lookups = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
         self._get_window()
 
     def _get_window(self) -> None:
         """Connect to the Apple Music window using process ID.
 
-        Finds the process ID of `AppleMusic.exe` and attaches the `pywinauto` Application backend to it.
-        Sets `self.main_window` to the matched window, or None if not found.
+        Gets the process ID of `AppleMusic.exe` from the process tracker and looks up its top-level window.
+        Sets `self.main_window` to the wrapper of the matched window, or None if not found.
         """
 
-        pid = get_process_id('AppleMusic.exe')
+        self._elements.clear()
+
+        pid = self.process_tracker.get_pid()
         if pid is None:
             self.main_window = None
             return
 
-        app = Application(backend='uia').connect(process=pid)
-        self.main_window = app.window(title_re='.*Apple Music.*', visible_only=False, found_index=0)
+        windows = find_elements(process=pid, title_re='.*Apple Music.*', backend='uia', visible_only=False)
+        self.main_window = UIAWrapper(windows[0]) if windows else None
+
+    def _get_text(self, auto_id: str, control_type: str, index: int = 0) -> str:
+        """Read text of a UI element of the window, resolving the element only if it's not cached.
+
+        Args:
+            auto_id (str): Automation ID of the element.
+            control_type (str): Control type of the element.
+            index (int, optional): Index of the element among the matching ones. Defaults to 0.
+
+        Returns:
+            str: Text of the element.
+
+        Raises:
+            ElementNotFoundError: If the element is not found.
+            COMError: If the cached element (or the window) no longer exists.
+        """
+
+        key = (auto_id, control_type)
+        if key not in self._elements:
+            self.lookups += 1
+            found = find_elements(
+                parent=self.main_window.element_info, auto_id=auto_id, control_type=control_type, backend='uia', top_level_only=False
+            )
+            elements = [UIAWrapper(element) for element in found]
+
+            # Missing elements aren't cached, they may show up later
+            if elements:
+                self._elements[key] = elements
+        else:
+            elements = self._elements[key]
+
+        if index >= len(elements):
+            raise ElementNotFoundError(f'auto_id={auto_id}, control_type={control_type}, index={index}')
+
+        return elements[index].window_text()
 
     def _get_duration_from_window(self) -> int:
         """Extract song duration from progress bar.
@@ -39,18 +96,51 @@ class AppScraper:
 
         Returns:
             int: Duration of the track in seconds, or 0 if extraction fails.
+
+        Raises:
+            COMError: If a cached element no longer exists.
         """
 
         try:
-            cur_time = self.main_window.child_window(auto_id='CurrentTime', control_type='Text').window_text()
-            time_left = self.main_window.child_window(auto_id='Duration', control_type='Text').window_text().lstrip('-')
-        except (ElementNotFoundError, ElementAmbiguousError, ValueError):
+            cur_time = self._get_text('CurrentTime', 'Text')
+            time_left = self._get_text('Duration', 'Text').lstrip('-')
+        except (ElementNotFoundError, ValueError):
             return 0
 
         duration = convert_time_to_seconds(cur_time) + convert_time_to_seconds(time_left)
 
         return duration
 
+    def is_app_running(self) -> bool:
+        """Check whether Apple Music is running, without scanning processes.
+
+        Returns:
+            bool: True if the Apple Music process was found and is still running, False otherwise.
+        """
+
+        return self.process_tracker.process is not None and self.process_tracker.process.is_running()
+
+    def release(self) -> None:
+        """Drop the window and the cached UI elements, releasing their UI Automation (COM) objects."""
+
+        self.main_window = None
+        self._elements.clear()
+
+    def stats(self) -> dict:
+        """Get polling stats.
+
+        Returns:
+            dict: Number of 'polls' and element 'lookups', 'mean_time' and 'max_time' of a poll in seconds.
+        """
+
+        return {
+            'polls': self.polls,
+            'lookups': self.lookups,
+            'mean_time': self.total_time / self.polls if self.polls else 0.0,
+            'max_time': self.max_time,
+        }
+
+    @timed('app_scraper')
     def update_metadata(self, song: Song) -> bool:
         """Update song metadata from the Apple Music app GUI.
 
@@ -63,45 +153,60 @@ class AppScraper:
             bool: True if metadata was successfully updated, False otherwise.
         """
 
-        if not self.main_window or not self.main_window.exists():
+        start = time.perf_counter()
+        try:
+            return self._read_metadata(song)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.polls += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def _read_metadata(self, song: Song) -> bool:
+        """Body of `update_metadata()`."""
+
+        if self.main_window is None:
             self._get_window()
 
-        if not self.main_window:
+        if self.main_window is None:
             return False
 
         try:
-            title = self.main_window.child_window(auto_id='myScrollViewer', control_type='Pane', found_index=0).window_text()
-            artist, *album = (
-                self.main_window.child_window(auto_id='myScrollViewer', control_type='Pane', found_index=1).window_text().split(' — ')
-            )
-            pause_play = self.main_window.child_window(auto_id='TransportControl_PlayPauseStop', control_type='Button').window_text()
-        except (ElementNotFoundError, ElementAmbiguousError):
+            return self._update_song(song)
+        except ElementNotFoundError:
+            self._elements.clear()
             return False
+        except COMError:
+            logger.debug('Apple Music UI elements are stale, looking up the window again')
+            self.main_window = None
+            return False
+
+    def _update_song(self, song: Song) -> bool:
+        """Read the window and update the song.
+
+        Raises:
+            ElementNotFoundError: If an element is not found.
+            COMError: If a cached element (or the window) no longer exists.
+        """
+
+        title = self._get_text('myScrollViewer', 'Pane', 0)
+        artist, *album = self._get_text('myScrollViewer', 'Pane', 1).split(' — ')
+        pause_play = self._get_text('TransportControl_PlayPauseStop', 'Button')
 
         id = f'{artist} - {title}'
         if song.is_same_song(id=id):
             # Trying to get duration from progress bar if current duration is not from the app
-            duration = song.metadata['duration'] if song.metadata['is_app_duration'] else self._get_duration_from_window()
-            song.metadata.update(
-                {
-                    'playing': True if pause_play in ('Pause', 'Приостановить') else False,
-                    'duration': duration,
-                    'is_app_duration': bool(duration),
-                }
-            )
+            duration = song.metadata.duration if song.metadata.is_app_duration else self._get_duration_from_window()
         else:
             duration = self._get_duration_from_window()
-            song.metadata.update(
-                {
-                    'title': title,
-                    'artist': artist,
-                    'id': id,
-                    'album': album[0] if album else '',
-                    'playing': True if pause_play in ('Pause', 'Приостановить') else False,
-                    'duration': duration,
-                    'is_app_duration': bool(duration),
-                    'artwork': None,
-                }
-            )
+            song.metadata.title = title
+            song.metadata.artist = artist
+            song.metadata.id = id
+            song.metadata.album = album[0] if album else ''
+            song.metadata.artwork = None
+
+        song.metadata.playing = pause_play in ('Pause', 'Приостановить')
+        song.metadata.duration = duration
+        song.metadata.is_app_duration = bool(duration)
 
         return True
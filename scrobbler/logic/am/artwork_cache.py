@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ArtworkCache:
+    """Content-addressed on-disk store of artwork thumbnails.
+
+    Each thumbnail is stored as a file named after the SHA-1 hash of its artwork URL. Total size of the files is capped,
+    files that weren't read for the longest time (by modification time, which is updated on every read) are evicted first.
+    """
+
+    def __init__(self, directory: Path, max_size: int):
+        """Initialize the cache and compute current size of the stored thumbnails.
+
+        Args:
+            directory (Path): Directory for the thumbnails.
+            max_size (int): Max total size of the thumbnails in bytes.
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def _path(self, url: str) -> Path:
+        """Get path of the thumbnail file for an artwork URL."""
+
+        return self.directory / hashlib.sha1(url.encode()).hexdigest()
+
+    def get(self, url: str) -> bytes | None:
+        """Get a stored thumbnail.
+
+        Args:
+            url (str): Artwork URL.
+
+        Returns:
+            bytes | None: Encoded thumbnail, or None if it's not stored.
+        """
+
+        path = self._path(url)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return data
+
+    def put(self, url: str, data: bytes) -> None:
+        """Store a thumbnail and evict old ones if the cache is over its size budget.
+
+        Args:
+            url (str): Artwork URL.
+            data (bytes): Encoded thumbnail.
+        """
+
+        path = self._path(url)
+        tmp_path = path.with_suffix('.tmp')
+
+        with self._lock:
+            try:
+                old_size = path.stat().st_size if path.exists() else 0
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                logger.warning("Couldn't save artwork to the cache, URL: %s", url, exc_info=True)
+                return
+
+            self._size += len(data) - old_size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used thumbnails until total size fits into `max_size`. Must be called with `_lock` held."""
+
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.is_file()), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._size <= self.max_size:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+
+    def stats(self) -> dict:
+        """Get cache stats.
+
+        Returns:
+            dict: 'hits', 'misses' and total 'size' of the thumbnails in bytes.
+        """
+
+        return {'hits': self.hits, 'misses': self.misses, 'size': self._size}
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+
+import httpx
+from PIL import Image
+
+from config import Config
+from scrobbler.metrics import timed
+
+from ..resilience import CircuitOpenError, call_with_retry_async
+from ..song import Song
+from .extractors import extract_album_url
+from .web_scraper import WebScraper
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWebScraper(WebScraper):
+    """`WebScraper` variant that makes requests with a shared `httpx.AsyncClient`.
+
+    The client runs on its own event loop thread and keeps pooled keep-alive connections to Apple Music,
+    multiplexed over HTTP/2. `update_metadata()` is a blocking call with an overall deadline, so it can be used
+    in place of `WebScraper.update_metadata()`. HTTP and artwork caches and the circuit breaker are shared with
+    `WebScraper`. `close()` releases the client and the event loop thread.
+    """
+
+    REQUEST_TIMEOUT = httpx.Timeout(10, connect=5)
+    DEADLINE = 20
+
+    def __init__(self):
+        super().__init__()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        self.client = asyncio.run_coroutine_threadsafe(self._create_client(), self._loop).result()
+
+    async def _create_client(self) -> httpx.AsyncClient:
+        """Create the HTTP client, must be called on the event loop."""
+
+        return httpx.AsyncClient(
+            http2=True,
+            timeout=self.REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60),
+            follow_redirects=True,
+        )
+
+    async def _get_async(self, url: str, **kwargs) -> httpx.Response:
+        """Make a GET request to Apple Music, retrying connection errors and timeouts with backoff.
+
+        Args:
+            url (str): URL to get.
+            **kwargs: Keyword arguments for `httpx.AsyncClient.get()`.
+
+        Returns:
+            httpx.Response: Response.
+
+        Raises:
+            httpx.HTTPError: If the request failed.
+            CircuitOpenError: If Apple Music circuit breaker is open.
+        """
+
+        return await call_with_retry_async(self.client.get, url, breaker=self.breaker, retry_on=(httpx.TransportError,), attempts=2, **kwargs)
+
+    async def _get_page_async(self, url: str) -> bytes | None:
+        """Get body of a web page, using the HTTP cache.
+
+        Args:
+            url (str): URL of the page.
+
+        Returns:
+            bytes | None: Body of the page, or None if request failed.
+        """
+
+        entry = self.http_cache.lookup(url)
+        if entry is not None and entry['fresh']:
+            return entry['body']
+
+        try:
+            response = await self._get_async(url, headers=self.http_cache.conditional_headers(entry))
+            if response.status_code == 304 and entry is not None:
+                self.http_cache.refresh(url, response.headers)
+                return entry['body']
+
+            response.raise_for_status()
+        except (httpx.HTTPError, CircuitOpenError):
+            logger.warning("Couldn't fetch web page, URL: %s", url, exc_info=True)
+            return None
+
+        self.http_cache.store(url, response.headers, response.content)
+
+        return response.content
+
+    async def _fetch_artwork_async(self, url: str) -> Image.Image | None:
+        """Get an artwork thumbnail of `ARTWORK_SIZE`, from the artwork cache if possible.
+
+        Args:
+            url (str): Artwork URL.
+
+        Returns:
+            Image.Image | None: Artwork thumbnail, or None if request failed.
+        """
+
+        data = self.artwork_cache.get(url)
+        if data is None:
+            try:
+                response = await self._get_async(url)
+                response.raise_for_status()
+            except (httpx.HTTPError, CircuitOpenError):
+                logger.warning("Couldn't fetch artwork, URL: %s", url, exc_info=True)
+                return None
+
+            data = self._make_thumbnail(response.content)
+            self.artwork_cache.put(url, data)
+
+        return self._open_image(data)
+
+    async def _update_metadata_async(self, song: Song) -> None:
+        """Coroutine behind `update_metadata()`."""
+
+        song_search_url = self._build_search_url(song.metadata.title, song.metadata.artist, song.metadata.album)
+        search_page = await self._get_page_async(song_search_url)
+        if not search_page:
+            return
+
+        album_url = extract_album_url(search_page)
+        if not album_url:
+            return
+
+        album_page = await self._get_page_async(album_url)
+        if not album_page:
+            return
+
+        json_album_data = self._parse_album_data(album_page)
+        if json_album_data is None:
+            return
+
+        self._update_duration(song, json_album_data)
+
+        if not Config.MINIMAL_GUI and (artwork_url := self._get_artwork_url(json_album_data)):
+            song.metadata.artwork = await self._fetch_artwork_async(artwork_url)
+
+    @timed('web_metadata')
+    def update_metadata(self, song: Song) -> None:
+        """Update song metadata by scraping Apple Music.
+
+        Blocks until metadata is fetched or `DEADLINE` seconds pass.
+
+        Fetches:
+        - Duration of the song (if not already provided by the app).
+        - Album artwork (if GUI mode is not minimal).
+
+        Args:
+            song (Song): Song object to update.
+        """
+
+        future = asyncio.run_coroutine_threadsafe(self._update_metadata_async(song), self._loop)
+        try:
+            future.result(timeout=self.DEADLINE)
+        except TimeoutError:
+            future.cancel()
+            logger.warning("Couldn't fetch song metadata from Apple Music in %d s, song metadata: %s", self.DEADLINE, song.metadata)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Close the HTTP client, stop the event loop thread and close the HTTP cache.
+
+        Args:
+            timeout (float, optional): Max seconds to wait for the client to close. Defaults to 5.0.
+        """
+
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.aclose(), self._loop).result(timeout=timeout)
+        except (TimeoutError, httpx.HTTPError):
+            logger.warning("Couldn't close Apple Music HTTP client", exc_info=True)
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._loop.close()
+
+        self.session.close()
+        self.http_cache.close()
@@ -0,0 +1,119 @@
+import codecs
+from html.parser import HTMLParser
+
+# Size of the chunks pages are fed to the parser in
+CHUNK_SIZE = 16 * 1024
+
+
+class _Found(Exception):
+    """Raised by an extractor to stop parsing once it has what it needs."""
+
+
+class _Extractor(HTMLParser):
+    """Base for streaming extractors that pull a single value out of a page and stop parsing as soon as they have it."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.result = None
+
+    def extract(self, page: bytes) -> str | None:
+        """Feed the page to the parser chunk by chunk until the value is found.
+
+        Args:
+            page (bytes): UTF-8 encoded HTML page.
+
+        Returns:
+            str | None: Extracted value, or None if it's not on the page.
+        """
+
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        try:
+            for start in range(0, len(page), CHUNK_SIZE):
+                self.feed(decoder.decode(page[start : start + CHUNK_SIZE]))
+            self.close()
+        except _Found:
+            pass
+
+        return self.result
+
+
+class _AlbumURLExtractor(_Extractor):
+    """Finds URL of the album of the first song in Apple Music search results.
+
+    It's the `href` of the first `<a class="click-action ...">` inside the first `<div class="track-lockup ...">`.
+    """
+
+    SONG_CLASS = 'track-lockup svelte-1tnc1ep is-link'
+    SONG_NAME_CLASS = 'click-action svelte-c0t0j2'
+
+    def __init__(self):
+        super().__init__()
+        self.song_div_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == 'div':
+            if self.song_div_depth:
+                self.song_div_depth += 1
+            elif dict(attrs).get('class') == self.SONG_CLASS:
+                self.song_div_depth = 1
+        elif tag == 'a' and self.song_div_depth:
+            attrs = dict(attrs)
+            if attrs.get('class') == self.SONG_NAME_CLASS:
+                self.result = attrs.get('href')
+                raise _Found
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == 'div' and self.song_div_depth:
+            self.song_div_depth -= 1
+
+            # First song has no link to the album, same as BeautifulSoup's `find()` the search stops here
+            if not self.song_div_depth:
+                raise _Found
+
+
+class _AlbumJSONExtractor(_Extractor):
+    """Gets the text of the first `<script type="application/json">` on an Apple Music album page."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_script = False
+        self.parts = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == 'script' and dict(attrs).get('type') == 'application/json':
+            self.in_script = True
+
+    def handle_data(self, data: str) -> None:
+        if self.in_script:
+            self.parts.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == 'script' and self.in_script:
+            self.result = ''.join(self.parts)
+            raise _Found
+
+
+def extract_album_url(search_page: bytes) -> str | None:
+    """Extract URL of the album of the first song from an Apple Music search page.
+
+    Args:
+        search_page (bytes): Search page.
+
+    Returns:
+        str | None: Album URL, or None if not found.
+    """
+
+    return _AlbumURLExtractor().extract(search_page)
+
+
+def extract_album_json(album_page: bytes) -> str | None:
+    """Extract the embedded JSON data from an Apple Music album page.
+
+    Args:
+        album_page (bytes): Album page.
+
+    Returns:
+        str | None: JSON text, or None if not found.
+    """
+
+    return _AlbumJSONExtractor().extract(album_page)
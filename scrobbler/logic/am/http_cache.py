@@ -0,0 +1,232 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_cache_control(value: str) -> dict:
+    """Parse a Cache-Control header into a dict of directives (e.g. 'no-cache, max-age=60' -> {'no-cache': None, 'max-age': '60'})."""
+
+    directives = {}
+    for directive in value.split(','):
+        name, _, arg = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+
+    return directives
+
+
+class HTTPCache:
+    """On-disk HTTP cache for web pages with conditional revalidation.
+
+    Responses are stored zlib-compressed in an SQLite database together with their validators (ETag, Last-Modified)
+    and expiration time computed from Cache-Control/Expires. The total size of stored bodies is capped,
+    least recently used entries are evicted first.
+
+    The cache doesn't make requests itself, so it can be used with any HTTP client:
+        1. `lookup()` an entry. If it's fresh, use its body.
+        2. Otherwise send the request with `conditional_headers()`.
+        3. On 304 call `refresh()` and use the cached body, on 200 `store()` the new response.
+    """
+
+    def __init__(self, path: Path, max_size: int):
+        """Initialize the cache.
+
+        Args:
+            path (Path): Path to the SQLite database file.
+            max_size (int): Max total size of compressed bodies in bytes.
+        """
+
+        self.max_size = max_size
+
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                '''
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires REAL NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                '''
+            )
+
+    def _expires(self, headers: Mapping[str, str]) -> float | None:
+        """Compute expiration time of a response from its headers.
+
+        Returns:
+            float | None: Expiration timestamp (time of the response if it must be revalidated every time),
+                or None if the response must not be stored.
+        """
+
+        now = time.time()
+        cache_control = _parse_cache_control(headers.get('Cache-Control', ''))
+
+        if 'no-store' in cache_control:
+            return None
+        if 'no-cache' in cache_control:
+            return now
+
+        max_age = cache_control.get('max-age')
+        if max_age is not None:
+            try:
+                return now + max(int(max_age) - int(headers.get('Age', 0)), 0)
+            except ValueError:
+                return now
+
+        if expires := headers.get('Expires'):
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                return now
+
+        return now
+
+    def lookup(self, url: str) -> dict | None:
+        """Get a cached response.
+
+        Args:
+            url (str): URL of the request.
+
+        Returns:
+            dict | None: Dict with 'body' (bytes), 'etag', 'last_modified' and 'fresh' (True if it can be used without
+                revalidation) keys, or None if URL isn't cached.
+        """
+
+        with self._lock:
+            row = self._db.execute('SELECT etag, last_modified, expires, body FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            with self._db:
+                self._db.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), url))
+
+        etag, last_modified, expires, body = row
+        fresh = expires > time.time()
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale += 1
+
+        return {'body': zlib.decompress(body), 'etag': etag, 'last_modified': last_modified, 'fresh': fresh}
+
+    def conditional_headers(self, entry: dict | None) -> dict:
+        """Build headers to revalidate a cached response.
+
+        Args:
+            entry (dict | None): Entry returned by `lookup()`.
+
+        Returns:
+            dict: 'If-None-Match' and/or 'If-Modified-Since' headers, empty if there is nothing to revalidate.
+        """
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    def store(self, url: str, headers: Mapping[str, str], body: bytes) -> None:
+        """Store a response, unless its headers forbid it or it can be neither reused nor revalidated.
+
+        Args:
+            url (str): URL of the request.
+            headers (Mapping[str, str]): Response headers (case-insensitive mapping).
+            body (bytes): Decoded response body.
+        """
+
+        expires = self._expires(headers)
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        now = time.time()
+
+        with self._lock:
+            try:
+                with self._db:
+                    if expires is None or (expires <= now and not etag and not last_modified):
+                        self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+                        return
+
+                    compressed = zlib.compress(body)
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (url, etag, last_modified, expires, compressed, len(compressed), now),
+                    )
+                    self._evict()
+            except sqlite3.Error:
+                logger.warning("Couldn't save response to the HTTP cache, URL: %s", url, exc_info=True)
+
+    def refresh(self, url: str, headers: Mapping[str, str]) -> None:
+        """Update expiration time and validators of a cached response after a 304 Not Modified response.
+
+        Args:
+            url (str): URL of the request.
+            headers (Mapping[str, str]): Headers of the 304 response.
+        """
+
+        expires = self._expires(headers)
+
+        with self._lock:
+            with self._db:
+                if expires is None:
+                    self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+                    return
+
+                self._db.execute(
+                    '''
+                    UPDATE responses
+                    SET expires = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                    WHERE url = ?
+                    ''',
+                    (expires, headers.get('ETag'), headers.get('Last-Modified'), url),
+                )
+
+    def _evict(self) -> None:
+        """Delete least recently used responses until total size fits into `max_size`. Must be called with `_lock` held."""
+
+        total_size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        evicted = []
+        for url, size in self._db.execute('SELECT url, size FROM responses ORDER BY last_access'):
+            if total_size <= self.max_size:
+                break
+            evicted.append((url,))
+            total_size -= size
+
+        self._db.executemany('DELETE FROM responses WHERE url = ?', evicted)
+
+    def stats(self) -> dict:
+        """Get cache stats.
+
+        Returns:
+            dict: Number of lookups of fresh responses ('hits'), of stale ones that need revalidation ('stale')
+                and of uncached URLs ('misses').
+        """
+
+        return {'hits': self.hits, 'stale': self.stale, 'misses': self.misses}
+
+    def close(self) -> None:
+        """Close the database."""
+
+        with self._lock:
+            self._db.close()
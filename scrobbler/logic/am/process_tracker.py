@@ -0,0 +1,136 @@
+import logging
+import time
+from typing import Callable
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessTracker:
+    """Tracks the PID of a process by its name without scanning all processes on every call.
+
+    - The found process is cached, and only checked to still be running (which also catches PID reuse).
+    - While the process isn't running, rescans happen on a backoff schedule, from `min_delay` up to `max_delay` seconds.
+    - A rescan lists PIDs with their creation times and only looks up names of the processes started since
+      the previous scan, so processes that were already there are never inspected twice. Processes are identified
+      by (PID, creation time), so a new process reusing a PID of the previous scan is still inspected.
+    """
+
+    def __init__(self, name: str, min_delay: float = 1.0, max_delay: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """Initialize the tracker.
+
+        Args:
+            name (str): Name of the process, e.g. 'AppleMusic.exe'.
+            min_delay (float, optional): Seconds before the first rescan after a miss. Defaults to 1.0.
+            max_delay (float, optional): Max seconds between rescans. Defaults to 30.0.
+            clock (Callable[[], float], optional): Monotonic clock in seconds. Defaults to `time.monotonic`.
+        """
+
+        self.name = name
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.clock = clock
+
+        self.process = None
+        # (PID, creation time) of processes inspected by previous scans
+        self.known_processes = set()
+        self.delay = min_delay
+        self.next_scan = 0.0
+
+        self.scans = 0
+        self.inspected = 0
+        self.total_scan_time = 0.0
+        self.max_scan_time = 0.0
+
+    def get_pid(self) -> int | None:
+        """Get PID of the process.
+
+        Returns:
+            int | None: PID if the process is running, None if it's not or if it's not time to rescan yet.
+        """
+
+        if self.process is not None:
+            if self.process.is_running():
+                return self.process.pid
+
+            logger.info('%s (PID %d) exited', self.name, self.process.pid)
+            self.process = None
+
+        now = self.clock()
+        if now < self.next_scan:
+            return None
+
+        self.process = self._scan()
+        if self.process is None:
+            self.next_scan = now + self.delay
+            self.delay = min(self.delay * 2, self.max_delay)
+            return None
+
+        self.delay = self.min_delay
+        self.next_scan = 0.0
+
+        return self.process.pid
+
+    def reset(self) -> None:
+        """Forget the cached process and rescan on the next call."""
+
+        self.process = None
+        self.delay = self.min_delay
+        self.next_scan = 0.0
+
+    def _scan(self) -> psutil.Process | None:
+        """Look for the process among the ones started since the previous scan."""
+
+        start = time.perf_counter()
+
+        found = None
+        known = set()
+        for pid in psutil.pids():
+            try:
+                process = psutil.Process(pid)
+            except psutil.Error:
+                continue
+
+            try:
+                key = (pid, process.create_time())
+            except psutil.Error:
+                # Creation time of some system processes can't be read, they are never the tracked process anyway
+                key = (pid, None)
+
+            # If found, the process is remembered as not yet seen, so it's found again after `reset()`
+            if found is None and key not in self.known_processes:
+                self.inspected += 1
+                try:
+                    if process.name() == self.name:
+                        found = process
+                        continue
+                except psutil.Error:
+                    pass
+
+            known.add(key)
+
+        self.known_processes = known
+
+        elapsed = time.perf_counter() - start
+        self.scans += 1
+        self.total_scan_time += elapsed
+        self.max_scan_time = max(self.max_scan_time, elapsed)
+
+        return found
+
+    def stats(self) -> dict:
+        """Get scan stats.
+
+        Returns:
+            dict: Number of 'scans' and 'inspected' processes, 'total_scan_time' and 'max_scan_time' in seconds,
+                current rescan 'delay' in seconds.
+        """
+
+        return {
+            'scans': self.scans,
+            'inspected': self.inspected,
+            'total_scan_time': self.total_scan_time,
+            'max_scan_time': self.max_scan_time,
+            'delay': self.delay,
+        }
@@ -4,22 +4,35 @@ from io import BytesIO
 from urllib.parse import quote
 
 import requests
-from bs4 import BeautifulSoup
 from PIL import Image
-from requests.exceptions import HTTPError, RequestException, Timeout
+from requests.exceptions import ConnectionError, HTTPError, RequestException, Timeout
 
 from config import Config
+from scrobbler.metrics import timed
 
+from ..resilience import APPLE_MUSIC, CircuitOpenError, call_with_retry, get_breaker
 from ..song import Song
+from .artwork_cache import ArtworkCache
+from .extractors import extract_album_json, extract_album_url
+from .http_cache import HTTPCache
 
 logger = logging.getLogger(__name__)
 
 
 class WebScraper:
-    """Scrapes Apple Music web pages to fetch song metadata, duration, and artwork."""
+    """Scrapes Apple Music web pages to fetch song metadata, duration, and artwork.
+
+    Web pages are cached in `http_cache` and revalidated with conditional requests,
+    artwork thumbnails are cached in `artwork_cache`. Requests to Apple Music go through the shared Apple Music circuit breaker.
+    """
+
+    ARTWORK_SIZE = (50, 50)
 
     def __init__(self):
         self.session = requests.Session()
+        self.breaker = get_breaker(APPLE_MUSIC)
+        self.http_cache = HTTPCache(Config.HTTP_CACHE_FILE, Config.HTTP_CACHE_MAX_SIZE)
+        self.artwork_cache = ArtworkCache(Config.ARTWORK_CACHE_DIR, Config.ARTWORK_CACHE_MAX_SIZE)
 
     def _build_search_url(self, title: str, artist: str, album: str) -> str:
         """Build a search URL for Apple Music using title of a song, artist name and album name."""
@@ -29,30 +42,167 @@ class WebScraper:
 
         return f'https://music.apple.com/us/search?term={encoded_search}'
 
-    def fetch_data(self, url: str, is_image: bool = False) -> BeautifulSoup | Image.Image | None:
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """Make a GET request to Apple Music, retrying connection errors and timeouts with backoff.
+
+        Args:
+            url (str): URL to get.
+            **kwargs: Keyword arguments for `requests.Session.get()`.
+
+        Returns:
+            requests.Response: Response.
+
+        Raises:
+            RequestException: If the request failed.
+            CircuitOpenError: If Apple Music circuit breaker is open.
+        """
+
+        return call_with_retry(self.session.get, url, breaker=self.breaker, retry_on=(ConnectionError, Timeout), attempts=2, timeout=10, **kwargs)
+
+    def _get_page(self, url: str) -> bytes:
+        """Get body of a web page, using the HTTP cache.
+
+        A fresh cached page is returned without a request, a stale one is revalidated with a conditional request.
+
+        Args:
+            url (str): URL of the page.
+
+        Returns:
+            bytes: Body of the page.
+
+        Raises:
+            RequestException: If the request failed.
+            CircuitOpenError: If Apple Music circuit breaker is open.
+        """
+
+        entry = self.http_cache.lookup(url)
+        if entry is not None and entry['fresh']:
+            return entry['body']
+
+        response = self._get(url, headers=self.http_cache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.http_cache.refresh(url, response.headers)
+            return entry['body']
+
+        response.raise_for_status()
+        self.http_cache.store(url, response.headers, response.content)
+
+        return response.content
+
+    @timed('web_fetch')
+    def fetch_data(self, url: str, is_image: bool = False) -> bytes | Image.Image | None:
         """Fetch content from a URL.
 
         Args:
             url (str): URL to fetch.
-            is_image (bool, optional): If True, fetch and return as a PIL Image. If False, return a BeautifulSoup object. Defaults to False.
+            is_image (bool, optional): If True, fetch and return as a PIL Image. If False, return body of the page. Defaults to False.
 
         Returns:
-            BeautifulSoup | Image.Image | None: Parsed HTML, image, or None if request failed.
+            bytes | Image.Image | None: Body of the page, image, or None if request failed.
         """
 
         try:
-            response = self.session.get(url, timeout=10, stream=is_image)
-            response.raise_for_status()
             if is_image:
-                with Image.open(BytesIO(response.content)) as img:
-                    img.load()
-                    return img
+                response = self.session.get(url, timeout=10, stream=True)
+                response.raise_for_status()
+                return self._open_image(response.content)
             else:
-                res = BeautifulSoup(response.text, 'html.parser')
-                return res
-        except (HTTPError, Timeout, RequestException):
+                return self._get_page(url)
+        except (HTTPError, Timeout, RequestException, CircuitOpenError):
             logger.warning("Couldn't fetch web page, URL: %s", url, exc_info=True)
 
+    def _make_thumbnail(self, data: bytes) -> bytes:
+        """Shrink an encoded image to `ARTWORK_SIZE` if it's bigger.
+
+        Args:
+            data (bytes): Encoded image.
+
+        Returns:
+            bytes: Encoded thumbnail.
+        """
+
+        with Image.open(BytesIO(data)) as img:
+            if img.width <= self.ARTWORK_SIZE[0] and img.height <= self.ARTWORK_SIZE[1]:
+                return data
+
+            img.thumbnail(self.ARTWORK_SIZE)
+            buffer = BytesIO()
+            img.convert('RGB').save(buffer, format='JPEG', quality=90)
+            return buffer.getvalue()
+
+    def _open_image(self, data: bytes) -> Image.Image:
+        """Decode an encoded image into a PIL image."""
+
+        with Image.open(BytesIO(data)) as img:
+            img.load()
+            return img
+
+    def fetch_artwork(self, url: str) -> Image.Image | None:
+        """Get an artwork thumbnail of `ARTWORK_SIZE`, from the artwork cache if possible.
+
+        On a cache miss the artwork is downloaded, shrunk to `ARTWORK_SIZE` if it's bigger and stored in the cache.
+
+        Args:
+            url (str): Artwork URL.
+
+        Returns:
+            Image.Image | None: Artwork thumbnail, or None if request failed.
+        """
+
+        data = self.artwork_cache.get(url)
+        if data is None:
+            try:
+                response = self._get(url)
+                response.raise_for_status()
+            except (HTTPError, Timeout, RequestException, CircuitOpenError):
+                logger.warning("Couldn't fetch artwork, URL: %s", url, exc_info=True)
+                return None
+
+            data = self._make_thumbnail(response.content)
+            self.artwork_cache.put(url, data)
+
+        return self._open_image(data)
+
+    def _parse_album_data(self, album_page: bytes) -> dict | None:
+        """Get album data from the JSON embedded into an Apple Music album page.
+
+        Args:
+            album_page (bytes): Album page.
+
+        Returns:
+            dict | None: Album data, or None if not found.
+        """
+
+        script_text = extract_album_json(album_page)
+        if script_text is None:
+            return None
+
+        try:
+            return json.loads(script_text)[0]
+        except (ValueError, IndexError, KeyError):
+            logger.error('Apple Music changed structure of the script_tag.', exc_info=True)
+
+    def _update_duration(self, song: Song, json_album_data: dict) -> None:
+        """Set song duration from album data, if there is no duration from the Apple Music app."""
+
+        if not song.metadata.is_app_duration:
+            track_list = json_album_data.get('data', {}).get('sections', [{}, {}])[1].get('items', [])
+            for track in track_list:
+                if track.get('isProminent'):
+                    duration = track.get('duration', 0) // 1000
+                    if duration:
+                        song.metadata.duration = duration
+
+    def _get_artwork_url(self, json_album_data: dict) -> str | None:
+        """Get URL of album's artwork thumbnail of `ARTWORK_SIZE` from album data."""
+
+        artwork_data = (
+            json_album_data.get('data', {}).get('sections', [{}])[0].get('items', [{}])[0].get('artwork', {}).get('dictionary', {})
+        )
+        if artwork_data and (artwork_url := artwork_data.get('url')):
+            return artwork_url.format(w=self.ARTWORK_SIZE[0], h=self.ARTWORK_SIZE[1], f='jpg')
+
+    @timed('web_metadata')
     def update_metadata(self, song: Song) -> None:
         """Update song metadata by scraping Apple Music.
 
@@ -64,50 +214,27 @@ class WebScraper:
             song (Song): Song object to update.
         """
 
-        song_search_url = self._build_search_url(song.metadata['title'], song.metadata['artist'], song.metadata['album'])
-        search_soup = self.fetch_data(song_search_url)
-        if not search_soup:
-            return
-
-        # Find first song in result from search
-        song_tag = search_soup.find('div', {'class': 'track-lockup svelte-1tnc1ep is-link'})
-        if not song_tag:
-            return
-
-        # Get URL of an album where the song is
-        song_name_tag = song_tag.find('a', {'class': 'click-action svelte-c0t0j2'})
-        if not song_name_tag:
+        song_search_url = self._build_search_url(song.metadata.title, song.metadata.artist, song.metadata.album)
+        search_page = self.fetch_data(song_search_url)
+        if not search_page:
             return
 
-        album_url = song_name_tag.get('href')
-        album_soup = self.fetch_data(album_url)
-        if not album_soup:
+        # Get URL of an album where the first song in result from search is
+        album_url = extract_album_url(search_page)
+        if not album_url:
             return
 
-        script_tag = album_soup.find('script', type='application/json')
-        if not script_tag:
+        album_page = self.fetch_data(album_url)
+        if not album_page:
             return
 
-        try:
-            json_album_data = json.loads(script_tag.text)[0]
-        except (ValueError, IndexError, KeyError):
-            logger.error('Apple Music changed structure of the script_tag.', exc_info=True)
+        json_album_data = self._parse_album_data(album_page)
+        if json_album_data is None:
             return
 
         # If no duration from AM app - then update duration
-        if not song.metadata.get('is_app_duration', False):
-            track_list = json_album_data.get('data', {}).get('sections', [{}, {}])[1].get('items', [])
-            for track in track_list:
-                if track.get('isProminent'):
-                    duration = track.get('duration', 0) // 1000
-                    if duration:
-                        song.metadata['duration'] = duration
-
-        if not Config.MINIMAL_GUI:
-            # Get album's artwork
-            artwork_data = (
-                json_album_data.get('data', {}).get('sections', [{}])[0].get('items', [{}])[0].get('artwork', {}).get('dictionary', {})
-            )
-            if artwork_data and (artwork_url := artwork_data.get('url')):
-                artwork_url = artwork_url.format(w=50, h=50, f='jpg')
-                song.metadata['artwork'] = self.fetch_data(artwork_url, is_image=True)
+        self._update_duration(song, json_album_data)
+
+        # Get album's artwork
+        if not Config.MINIMAL_GUI and (artwork_url := self._get_artwork_url(json_album_data)):
+            song.metadata.artwork = self.fetch_artwork(artwork_url)
@@ -0,0 +1,175 @@
+from math import ceil
+
+from .song import Song
+
+
+class ScrobbleEngine:
+    """Scrobbling state machine behind `run_background()`.
+
+    Takes observations of the Apple Music app (put into `song.metadata` by an app scraper) together with the current
+    time, tracks playtime in `song.state` and returns actions for the caller to perform. It does no I/O and never
+    sleeps, so it can be driven by the polling loop, a headless runner or a replay of a recorded trace alike.
+
+    Actions are `(kind, song)` tuples, where `song` is a copy of the song at the time of the action:
+        - `NOW_PLAYING`: set the song as now playing on Last.fm.
+        - `SCROBBLE`: scrobble the song.
+        - `NEW_SONG`: a new song started, fetch its metadata and pass the result to `apply_metadata()`.
+        - `RESET`: the song disappeared from the app and was reset.
+    """
+
+    NOW_PLAYING = 'now_playing'
+    SCROBBLE = 'scrobble'
+    NEW_SONG = 'new_song'
+    RESET = 'reset'
+
+    def __init__(self, song: Song):
+        """Initialize the engine.
+
+        Args:
+            song (Song): The Song object representing the current song.
+        """
+
+        self.song = song
+
+    def process(self, is_data: bool, now: float) -> tuple[tuple[str, Song], ...]:
+        """Process an observation of the Apple Music app.
+
+        Args:
+            is_data (bool): Whether there is a song in the app, its metadata is expected to be in `song.metadata`.
+            now (float): Time of the observation in seconds since epoch.
+
+        Returns:
+            tuple[tuple[str, Song], ...]: Actions to perform, in order.
+        """
+
+        song = self.song
+        metadata, state = song.metadata, song.state
+
+        # No song in Apple Music window
+        if not is_data:
+            return self._reset()
+
+        # Try to set duration from the app
+        if metadata.is_app_duration and not state.is_app_duration and metadata.id == state.id:
+            state.duration = metadata.duration
+            state.is_app_duration = True
+
+        cur_time = ceil(now)
+
+        # Encountered new song
+        if metadata.id != state.id:
+            return self._start_song(cur_time)
+
+        # If we continue to listen to the same song
+        if metadata.playing:
+            actions = ()
+
+            # If song was paused before that - mark as keep playing
+            if not state.playing:
+                actions = ((self.NOW_PLAYING, song.copy()),)
+                state.playing = True
+
+            # If it's a start of a listen - set timestamp and mark as started playing
+            if not state.started_playing:
+                state.started_playing_timestamp = int(cur_time)
+                state.started_playing = True
+
+            song.increase_playtime(cur_time)
+
+            # Relistening: song played beyond its duration is scrobbled again
+            if song.is_rescrobbable():
+                actions += ((self.SCROBBLE, song.copy()),)
+                state.started_playing_timestamp = int(cur_time)
+                state.playtime = 0
+                actions += ((self.NOW_PLAYING, song.copy()),)
+
+            state.last_time_played = cur_time
+
+            return actions
+
+        # If song is the same but paused (increase will happen if last time checked song was playing)
+        song.increase_playtime(cur_time)
+        state.last_time_played = None
+        state.playing = False
+
+        return ()
+
+    def _start_song(self, cur_time: int) -> tuple[tuple[str, Song], ...]:
+        """Scrobble the previous song if needed and start tracking the new one."""
+
+        song = self.song
+        actions = ()
+
+        song.increase_playtime(cur_time)
+
+        # Try to scrobble song that was played before this one
+        if song.is_scrobbable():
+            actions += ((self.SCROBBLE, song.copy()),)
+
+        song.reset_state()
+
+        # If song is playing - get start of a listen, mark as started playing, mark as now playing on last.fm
+        if song.metadata.playing:
+            song.state.started_playing_timestamp = int(cur_time)
+            song.state.last_time_played = cur_time
+            song.state.started_playing = True
+            song.state.playing = True
+
+            actions += ((self.NOW_PLAYING, song.copy()),)
+
+        # Metadata from web and Last.fm arrives later, until then use default duration if there is none from the app
+        song.state.assign(song.metadata)
+        if not song.state.duration:
+            song.state.duration = Song.DEFAULT_DURATION
+
+        actions += ((self.NEW_SONG, song.copy()),)
+
+        return actions
+
+    def _reset(self) -> tuple[tuple[str, Song], ...]:
+        """Scrobble the song if needed and reset it."""
+
+        song = self.song
+        actions = ()
+
+        if song.is_scrobbable():
+            actions += ((self.SCROBBLE, song.copy()),)
+
+        if song.state.id or song.metadata.id:
+            actions += ((self.RESET, song.copy()),)
+
+        song.reset_metadata()
+        song.reset_state()
+
+        return actions
+
+    def finish(self) -> tuple[tuple[str, Song], ...]:
+        """Get actions for when scrobbling stops: scrobble the current song if it's scrobbable or rescrobbable.
+
+        Returns:
+            tuple[tuple[str, Song], ...]: Actions to perform.
+        """
+
+        if self.song.is_scrobbable() or self.song.is_rescrobbable():
+            return ((self.SCROBBLE, self.song.copy()),)
+        return ()
+
+    def apply_metadata(self, track: Song) -> None:
+        """Apply metadata fetched for a `NEW_SONG` action to the song, if it's still the current one.
+
+        Duration from the Apple Music app takes precedence over the fetched one.
+
+        Args:
+            track (Song): Enriched copy of the song.
+        """
+
+        song = self.song
+        if song.state.id != track.metadata.id:
+            return
+
+        song.metadata.title = song.state.title = track.metadata.title
+        song.metadata.artist = song.state.artist = track.metadata.artist
+        song.metadata.artwork = song.state.artwork = track.metadata.artwork
+
+        if not song.state.is_app_duration:
+            song.metadata.duration = song.state.duration = track.metadata.duration
@@ -1,28 +1,101 @@
 import logging
 import time
 import webbrowser
+from io import BytesIO
+from typing import Callable
 
 import pylast
+from PIL import Image
 
 from config import Config
 from scrobbler.filework import load_user_data, save_user_data
-from scrobbler.utils import is_gif, make_circle
+from scrobbler.metrics import registry, timed
 
-from ..am import WebScraper
+from ..resilience import LASTFM, CircuitOpenError, backoff_delays, call_with_retry, get_breaker
 from ..song import Song
+from .avatar import AvatarCache, process_avatar
+from .cache import TrackMetadataCache
+from .journal import ScrobbleJournal
+from .rate_limit import Priority, RateLimiter, RateLimitExceeded
 
 logger = logging.getLogger(__name__)
 
+# Codes of `ignoredMessage` in the `track.scrobble` response
+SCROBBLE_ACCEPTED = '0'
+SCROBBLE_DAILY_LIMIT_EXCEEDED = '5'
+
+# Last.fm error code for an unknown track or artist
+NOT_FOUND_WS_ERROR = str(pylast.STATUS_INVALID_PARAMS)
+
+# Last.fm error codes (`pylast.WSError.status` is a string) after which a scrobble should be retried later instead of being dropped
+RETRYABLE_WS_ERRORS = {
+    str(status)
+    for status in (
+        pylast.STATUS_OPERATION_FAILED,
+        pylast.STATUS_OFFLINE,
+        pylast.STATUS_TEMPORARILY_UNAVAILABLE,
+        pylast.STATUS_RATE_LIMIT_EXCEEDED,
+    )
+}
+
+# Last.fm error codes of a session or API key problem, not of the scrobbles: they are kept and retried, e.g. after relogin
+AUTH_WS_ERRORS = {
+    str(status)
+    for status in (
+        pylast.STATUS_AUTH_FAILED,
+        pylast.STATUS_INVALID_SK,
+        pylast.STATUS_INVALID_API_KEY,
+        pylast.STATUS_INVALID_SIGNATURE,
+        pylast.STATUS_TOKEN_UNAUTHORIZED,
+        pylast.STATUS_TOKEN_EXPIRED,
+        pylast.STATUS_LOGIN_REQUIRED,
+        pylast.STATUS_API_KEY_SUSPENDED,
+    )
+}
+
 
 class Lastfm:
-    """Handles authentication, metadata retrieval, and scrobbling with the Last.fm API."""
+    """Handles authentication, metadata retrieval, and scrobbling with the Last.fm API.
+
+    Requests go through the shared Last.fm circuit breaker, so during an outage they fail fast instead of waiting for timeouts,
+    and through a rate limiter, which lets scrobbles go before 'now playing' updates and those before metadata requests.
+    """
 
     def __init__(self):
         self.network = pylast.LastFMNetwork(Config.API_KEY, Config.API_SECRET)
+        self.breaker = get_breaker(LASTFM)
+        self.rate_limiter = RateLimiter()
         self.username = None
         self.user_url = None
         self.user_obj = None
         self.avatar = None
+        self.avatar_cache = AvatarCache(Config.AVATAR_FILE, Config.AVATAR_CACHE_TTL)
+        self.journal = ScrobbleJournal(Config.SCROBBLE_JOURNAL_FILE, self._submit_scrobbles)
+        self.metadata_cache = TrackMetadataCache(Config.TRACK_CACHE_FILE, Config.TRACK_CACHE_TTL, Config.TRACK_CACHE_NEGATIVE_TTL)
+
+        registry.register_collector('track_cache', self.metadata_cache.stats)
+        registry.register_collector('lastfm_rate_limiter', self.rate_limiter.stats)
+
+    def _request(self, priority: int, func: Callable, *args, **kwargs):
+        """Make a Last.fm request once the rate limiter allows it.
+
+        Args:
+            priority (int): Priority of the request (one of `Priority`).
+            func (Callable): Function making the request.
+            *args: Arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Result of the function.
+
+        Raises:
+            RateLimitExceeded: If the request was dropped by the rate limiter.
+        """
+
+        if not self.rate_limiter.acquire(priority):
+            raise RateLimitExceeded(priority)
+
+        return func(*args, **kwargs)
 
     def is_valid_user_data(self, user_data: dict) -> bool:
         """Validate that loaded user data contains the required fields.
@@ -57,6 +130,7 @@ class Lastfm:
         webbrowser.open(url)
 
         start = time.perf_counter()
+        delays = backoff_delays(1, 5)
         while True:
             try:
                 # If user haven't logged in 3 minutes
@@ -67,8 +141,8 @@ class Lastfm:
                 self.user_obj = self.network.get_user(self.username)
                 self.user_url = self.user_obj.get_url()
                 break
-            except pylast.WSError:
-                time.sleep(1)
+            except (pylast.WSError, pylast.NetworkError):
+                time.sleep(next(delays))
 
         user_data = {
             'session_key': session_key,
@@ -77,10 +151,11 @@ class Lastfm:
         }
         save_user_data(user_data)
 
-        if not Config.MINIMAL_GUI:
-            self.set_avatar()
+        # Avatar of the previous user, if any, is replaced by `load_cached_avatar()` or `set_avatar()`
+        self.avatar = None
 
         self.network.session_key = session_key
+        self.journal.start(self.username)
 
         return True
 
@@ -103,41 +178,71 @@ class Lastfm:
 
         self.user_obj = self.network.get_user(self.username)
 
-        if not Config.MINIMAL_GUI:
-            self.set_avatar()
+        self.journal.start(self.username)
 
         return True
 
+    def load_cached_avatar(self) -> bool:
+        """Load the user's avatar saved on disk by `set_avatar()`. Makes no network requests.
+
+        Returns:
+            bool: True if the avatar was loaded and is fresh, False if there is none or it should be fetched again.
+        """
+
+        avatar, is_fresh = self.avatar_cache.load(self.username)
+        if avatar is not None:
+            self.avatar = avatar
+
+        return is_fresh
+
     def set_avatar(self) -> bool:
         """Fetch and process the user's Last.fm avatar.
 
-        Downloads the avatar and converts non-GIF images into circular format.
+        Downloads the avatar, crops it (every frame of a GIF) into circular format and saves it to disk,
+        so `load_cached_avatar()` can show it on later launches. Slow, so it's called on a background thread.
+        If another user logs in meanwhile, the avatar of the previous one is dropped.
 
         Returns:
             bool: True if avatar was successfully retrieved and processed, False otherwise.
         """
 
-        url = None
-        for _ in range(5):
-            try:
-                url = self.user_obj.get_image()
-                break
-            except pylast.NetworkError:
-                logger.warning("Couldn't fetch user's avatar url due to pylast.NetworkError, username: %s", self.username)
-                time.sleep(0.5)
+        # Relogin replaces both on the Tk thread while this runs
+        username, user_obj = self.username, self.user_obj
+
+        try:
+            url = call_with_retry(
+                self._request,
+                Priority.NOW_PLAYING,
+                user_obj.get_image,
+                breaker=self.breaker,
+                retry_on=(pylast.NetworkError,),
+                attempts=5,
+            )
+        except (pylast.NetworkError, CircuitOpenError, RateLimitExceeded):
+            logger.warning("Couldn't fetch user's avatar url due to network error, username: %s", username)
+            return False
 
         if not url:
             return False
 
-        self.avatar = WebScraper().fetch_data(url, is_image=True)
-        if not self.avatar:
+        # Imported here to keep `requests` out of the startup path
+        from ..am import WebScraper
+
+        avatar = WebScraper().fetch_data(url, is_image=True)
+        if not avatar:
+            return False
+
+        data = process_avatar(avatar, username)
+        if self.username != username:
+            logger.info('Dropped avatar of %s, %s logged in meanwhile', username, self.username)
             return False
 
-        if not is_gif(self.avatar):
-            self.avatar = make_circle(self.avatar)
+        self.avatar_cache.save(data)
+        self.avatar = Image.open(BytesIO(data))
 
         return True
 
+    @timed('lastfm_now_playing')
     def set_now_playing(self, song: Song) -> None:
         """Update the 'now playing' status on Last.fm for the given song.
 
@@ -146,63 +251,192 @@ class Lastfm:
         """
 
         try:
-            self.network.update_now_playing(
-                title=song.metadata['title'],
-                artist=song.metadata['artist'],
-                album=song.metadata['album'],
-                duration=song.metadata['duration'],
+            call_with_retry(
+                self._request,
+                Priority.NOW_PLAYING,
+                self.network.update_now_playing,
+                breaker=self.breaker,
+                retry_on=(pylast.NetworkError,),
+                title=song.metadata.title,
+                artist=song.metadata.artist,
+                album=song.metadata.album,
+                duration=song.metadata.duration,
             )
-        except pylast.NetworkError:
-            logger.warning("Couldn't set 'now playing' for the song due to pylast.NetworkError, song metadata: %s", song.metadata)
+        except (pylast.NetworkError, CircuitOpenError, RateLimitExceeded):
+            logger.warning("Couldn't set 'now playing' for the song due to network error, song metadata: %s", song.metadata)
 
+    @timed('scrobble_enqueue')
     def scrobble_song(self, song: Song) -> None:
-        """Scrobble given song.
+        """Queue given song for scrobbling.
+
+        The listen is persisted in the scrobble journal and sent to Last.fm by the journal's flusher thread.
 
         Args:
             song (Song): Song object representing the song.
         """
-        for _ in range(5):
-            try:
-                self.network.scrobble(
-                    title=song.state['title'],
-                    artist=song.state['artist'],
-                    album=song.state['album'],
-                    timestamp=song.state['started_playing_timestamp'],
-                )
+
+        self.journal.enqueue(
+            title=song.state.title,
+            artist=song.state.artist,
+            album=song.state.album,
+            timestamp=song.state.started_playing_timestamp,
+        )
+
+    def _submit_scrobbles(self, listens: list[dict]) -> list[str] | None:
+        """Scrobble a batch of up to 50 listens from the scrobble journal with a single `track.scrobble` request.
+
+        `pylast.LastFMNetwork.scrobble_many()` doesn't return the response, so the request is made directly
+        to see which listens were ignored by Last.fm. If Last.fm rejects a whole batch, its listens are sent one by one,
+        so only the ones it rejects are dropped.
+
+        Args:
+            listens (list[dict]): Listens with 'id', 'title', 'artist', 'album' and 'timestamp' keys.
+
+        Returns:
+            list[str] | None: IDs of the listens that were accepted or ignored by Last.fm for good,
+                None if the whole batch should be retried later.
+        """
+
+        params = {}
+        for i, listen in enumerate(listens):
+            params[f'artist[{i}]'] = listen['artist']
+            params[f'track[{i}]'] = listen['title']
+            params[f'timestamp[{i}]'] = listen['timestamp']
+            if listen['album']:
+                params[f'album[{i}]'] = listen['album']
+
+        try:
+            response = call_with_retry(
+                self._request,
+                Priority.SCROBBLE,
+                pylast._Request(self.network, 'track.scrobble', params).execute,
+                breaker=self.breaker,
+                retry_on=(pylast.NetworkError, pylast.MalformedResponseError),
+                attempts=2,
+            )
+        except (pylast.NetworkError, pylast.MalformedResponseError, CircuitOpenError, RateLimitExceeded):
+            logger.warning("Couldn't scrobble %d songs due to network error", len(listens))
+            return None
+        except pylast.WSError as e:
+            if e.status in RETRYABLE_WS_ERRORS:
+                logger.warning("Couldn't scrobble %d songs due to pylast.WSError (%s)", len(listens), e)
+                return None
+            if e.status in AUTH_WS_ERRORS:
+                logger.warning('Last.fm refused the session, keeping %d scrobbles until relogin. Error: %s', len(listens), e)
+                return None
+
+            if len(listens) > 1:
+                logger.warning('Last.fm rejected a batch of %d scrobbles (%s), sending them one by one', len(listens), e)
+                return self._submit_scrobbles_one_by_one(listens)
+
+            logger.error('Last.fm rejected the scrobble, dropping it. Error: %s, listen: %s', e, listens[0])
+            return [listens[0]['id']]
+
+        results = response.getElementsByTagName('scrobble')
+        if len(results) != len(listens):
+            return [listen['id'] for listen in listens]
+
+        done = []
+        for listen, result in zip(listens, results):
+            messages = result.getElementsByTagName('ignoredMessage')
+            code = messages[0].getAttribute('code') if messages else SCROBBLE_ACCEPTED
+
+            if code == SCROBBLE_DAILY_LIMIT_EXCEEDED:
+                logger.warning('Daily scrobble limit exceeded, listen will be retried later: %s', listen)
+                continue
+            if code != SCROBBLE_ACCEPTED:
+                logger.warning('Last.fm ignored the scrobble (code %s), listen: %s', code, listen)
+
+            done.append(listen['id'])
+
+        return done
+
+    def _submit_scrobbles_one_by_one(self, listens: list[dict]) -> list[str]:
+        """Scrobble listens of a rejected batch with a request per listen, in order.
+
+        Stops at the first listen that should be retried later, the rest of the batch is retried with it.
+
+        Args:
+            listens (list[dict]): Listens with 'id', 'title', 'artist', 'album' and 'timestamp' keys.
+
+        Returns:
+            list[str]: IDs of the listens that were accepted or rejected by Last.fm for good.
+        """
+
+        done = []
+        for listen in listens:
+            result = self._submit_scrobbles([listen])
+            if not result:
                 break
-            except pylast.NetworkError:
-                logger.warning("Couldn't scrobble the song due to pylast.NetworkError, song metadata: %s", song.state)
-                time.sleep(0.5)
+            done.extend(result)
+
+        return done
+
+    def _fetch_track_metadata(self, artist_name: str, title: str) -> tuple[str | None, str | None, int]:
+        """Fetch corrected title, corrected artist name and duration of a track from Last.fm.
+
+        Args:
+            artist_name (str): Artist name.
+            title (str): Song title.
+
+        Returns:
+            tuple[str | None, str | None, int]: Corrected title, corrected artist name (None if no correction)
+                and duration in seconds.
+
+        Raises:
+            RateLimitExceeded: If one of the requests was dropped by the rate limiter.
+        """
+
+        track = self.network.get_track(artist_name, title)
+        artist = self.network.get_artist(artist_name)
+
+        corrected_track = self._request(Priority.METADATA, track.get_correction)
+        corrected_artist = self._request(Priority.METADATA, artist.get_correction)
+        duration = self._request(Priority.METADATA, track.get_duration) // 1000
 
+        return corrected_track, corrected_artist, duration
+
+    @timed('lastfm_metadata')
     def update_metadata(self, song: Song) -> None:
         """Update the song's metadata with corrections and duration from Last.fm.
 
         Attempts to correct the title and artist name, and fetch the track duration.
-        Falls back to a default duration (120 seconds) if unavailable.
+        Falls back to a default duration (`Song.DEFAULT_DURATION`) if unavailable.
+        Results are cached in `metadata_cache`, so repeat plays of a song don't make any requests.
 
         Args:
             song (Song): Song object representing the song.
         """
 
-        try:
-            track = self.network.get_track(song.metadata['artist'], song.metadata['title'])
-            artist = self.network.get_artist(song.metadata['artist'])
+        artist_name, title = song.metadata.artist, song.metadata.title
 
-            corrected_track, corrected_artist = track.get_correction(), artist.get_correction()
-            if corrected_track:
-                song.metadata['title'] = corrected_track
-            if corrected_artist:
-                song.metadata['artist'] = corrected_artist
-
-            duration = track.get_duration() // 1000
-        except (pylast.WSError, pylast.NetworkError):
-            duration = 0
+        cached = self.metadata_cache.get(artist_name, title)
+        if cached is not None:
+            song.metadata.title, song.metadata.artist = cached['title'], cached['artist']
+            duration = cached['duration']
+        else:
+            try:
+                corrected_track, corrected_artist, duration = call_with_retry(
+                    self._fetch_track_metadata, artist_name, title, breaker=self.breaker, retry_on=(pylast.NetworkError,), attempts=2
+                )
+            except pylast.WSError as e:
+                duration = 0
+                if e.status == NOT_FOUND_WS_ERROR:
+                    self.metadata_cache.set_not_found(artist_name, title)
+            except (pylast.NetworkError, CircuitOpenError, RateLimitExceeded):
+                duration = 0
+            else:
+                if corrected_track:
+                    song.metadata.title = corrected_track
+                if corrected_artist:
+                    song.metadata.artist = corrected_artist
+                self.metadata_cache.set(artist_name, title, song.metadata.artist, song.metadata.title, duration)
 
         # If no duration neither from progress bar or AM web - set duration from last.fm
-        if not song.metadata.get('duration', 0):
+        if not song.metadata.duration:
             if duration:
-                song.metadata['duration'] = duration
+                song.metadata.duration = duration
 
-            # If even on last.fm no duration set it as 2 minutes
+            # If even on last.fm no duration set it to default
             else:
-                song.metadata['duration'] = 120
+                song.metadata.duration = Song.DEFAULT_DURATION
@@ -0,0 +1,103 @@
+import logging
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image, ImageSequence, PngImagePlugin, UnidentifiedImageError
+
+from scrobbler.utils import is_gif, make_circle
+
+logger = logging.getLogger(__name__)
+
+# Duration of a GIF frame in ms, if the GIF doesn't specify one
+DEFAULT_FRAME_DURATION = 100
+
+
+def process_avatar(avatar: Image.Image, username: str) -> bytes:
+    """Crop the avatar into a circle and encode it as PNG.
+
+    Every frame of an animated avatar is cropped, and the frames are encoded as an animated PNG (unlike GIF it keeps
+    the smooth edges of the circle), so nothing has to be cropped when the avatar is displayed.
+
+    Args:
+        avatar (Image.Image): Avatar as downloaded from Last.fm.
+        username (str): Last.fm username, stored in the PNG.
+
+    Returns:
+        bytes: Encoded avatar.
+    """
+
+    info = PngImagePlugin.PngInfo()
+    info.add_text('username', username)
+
+    buffer = BytesIO()
+
+    if not is_gif(avatar):
+        make_circle(avatar).save(buffer, format='PNG', pnginfo=info)
+        return buffer.getvalue()
+
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(avatar):
+        frames.append(make_circle(frame))
+        durations.append(frame.info.get('duration') or DEFAULT_FRAME_DURATION)
+
+    frames[0].save(buffer, format='PNG', save_all=True, append_images=frames[1:], duration=durations, loop=0, pnginfo=info)
+    return buffer.getvalue()
+
+
+class AvatarCache:
+    """Keeps the processed avatar of the user on disk, so later launches show it without any network requests.
+
+    The name of the user is stored in the PNG by `process_avatar()`, so the avatar of another user is never shown after relogin.
+    """
+
+    def __init__(self, path: Path, ttl: int):
+        """Initialize the cache.
+
+        Args:
+            path (Path): Path to the avatar file.
+            ttl (int): Seconds after which the avatar should be downloaded again (the stale one is still shown meanwhile).
+        """
+
+        self.path = path
+        self.ttl = ttl
+
+    def load(self, username: str) -> tuple[Image.Image | None, bool]:
+        """Load the cached avatar of the user.
+
+        Args:
+            username (str): Last.fm username.
+
+        Returns:
+            tuple[Image.Image | None, bool]: Avatar, or None if there is none for the user, and whether it's still fresh.
+        """
+
+        try:
+            modified = self.path.stat().st_mtime
+            # Read into memory, so the file isn't kept open and can be replaced
+            avatar = Image.open(BytesIO(self.path.read_bytes()))
+        except FileNotFoundError:
+            return None, False
+        except (OSError, UnidentifiedImageError):
+            logger.warning("Couldn't load cached avatar, path: %s", self.path, exc_info=True)
+            return None, False
+
+        if avatar.info.get('username') != username:
+            return None, False
+
+        return avatar, time.time() - modified < self.ttl
+
+    def save(self, data: bytes) -> None:
+        """Store an avatar encoded by `process_avatar()`.
+
+        Args:
+            data (bytes): Encoded avatar.
+        """
+
+        tmp_path = self.path.with_suffix('.tmp')
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning("Couldn't save avatar to the cache, path: %s", self.path, exc_info=True)
@@ -0,0 +1,142 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class TrackMetadataCache:
+    """Two-level cache of track metadata from Last.fm: an in-memory LRU backed by an SQLite database.
+
+    Entries are keyed on the raw (artist, title) as shown in the Apple Music app and hold the corrected title,
+    corrected artist and duration. Tracks unknown to Last.fm are cached as well (negative caching) with a shorter TTL.
+    """
+
+    def __init__(self, path: Path, ttl: int, negative_ttl: int, max_memory_entries: int = 512):
+        """Initialize the cache and drop expired entries from the database.
+
+        Args:
+            path (Path): Path to the SQLite database file.
+            ttl (int): Seconds a found track stays cached.
+            negative_ttl (int): Seconds a track unknown to Last.fm stays cached.
+            max_memory_entries (int, optional): Max number of entries in the in-memory LRU. Defaults to 512.
+        """
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_memory_entries = max_memory_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                '''
+                CREATE TABLE IF NOT EXISTS tracks (
+                    artist TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    corrected_artist TEXT NOT NULL,
+                    corrected_title TEXT NOT NULL,
+                    duration INTEGER NOT NULL,
+                    found INTEGER NOT NULL,
+                    expires REAL NOT NULL,
+                    PRIMARY KEY (artist, title)
+                )
+                '''
+            )
+            self._db.execute('DELETE FROM tracks WHERE expires < ?', (time.time(),))
+
+    def _remember(self, key: tuple[str, str], entry: tuple) -> None:
+        """Put an entry into the in-memory LRU, evicting the least recently used one if it's full."""
+
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, artist: str, title: str) -> dict | None:
+        """Get cached metadata of a track.
+
+        Args:
+            artist (str): Artist name as shown in the Apple Music app.
+            title (str): Song title as shown in the Apple Music app.
+
+        Returns:
+            dict | None: Dict with 'artist', 'title', 'duration' and 'found' keys, or None if the track isn't cached
+                or the entry expired.
+        """
+
+        key = (artist, title)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            else:
+                entry = self._db.execute(
+                    'SELECT corrected_artist, corrected_title, duration, found, expires FROM tracks WHERE artist = ? AND title = ?',
+                    key,
+                ).fetchone()
+                if entry is not None:
+                    self._remember(key, entry)
+
+            if entry is None or entry[4] < now:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        corrected_artist, corrected_title, duration, found, _ = entry
+        return {'artist': corrected_artist, 'title': corrected_title, 'duration': duration, 'found': bool(found)}
+
+    def set(self, artist: str, title: str, corrected_artist: str, corrected_title: str, duration: int) -> None:
+        """Cache metadata of a track found on Last.fm.
+
+        Args:
+            artist (str): Artist name as shown in the Apple Music app.
+            title (str): Song title as shown in the Apple Music app.
+            corrected_artist (str): Artist name corrected by Last.fm.
+            corrected_title (str): Song title corrected by Last.fm.
+            duration (int): Duration in seconds, 0 if Last.fm doesn't know it.
+        """
+
+        self._store((artist, title), (corrected_artist, corrected_title, duration, 1, time.time() + self.ttl))
+
+    def set_not_found(self, artist: str, title: str) -> None:
+        """Cache that a track is unknown to Last.fm.
+
+        Args:
+            artist (str): Artist name as shown in the Apple Music app.
+            title (str): Song title as shown in the Apple Music app.
+        """
+
+        self._store((artist, title), (artist, title, 0, 0, time.time() + self.negative_ttl))
+
+    def _store(self, key: tuple[str, str], entry: tuple) -> None:
+        """Write an entry to both cache levels."""
+
+        with self._lock:
+            self._remember(key, entry)
+            try:
+                with self._db:
+                    self._db.execute('INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)', key + entry)
+            except sqlite3.Error:
+                logger.warning("Couldn't save track metadata to the cache, track: %s", key, exc_info=True)
+
+    def stats(self) -> dict:
+        """Get hit/miss counters.
+
+        Returns:
+            dict: 'hits', 'misses' and number of entries in memory ('memory_entries').
+        """
+
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'memory_entries': len(self._memory)}
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+from scrobbler.metrics import registry
+
+from ..resilience import backoff_delays
+
+logger = logging.getLogger(__name__)
+
+
+class ScrobbleJournal:
+    """Append-only on-disk queue of listens waiting to be scrobbled.
+
+    Every listen is appended to the journal as an `add` record and is acknowledged with an `ack` record only after
+    Last.fm took it, so listens survive network outages, crashes and restarts. Records are written and fsynced in
+    batches by a background flusher thread, which also drains pending listens to Last.fm.
+
+    Every listen is stored with the Last.fm username it was recorded for, and only listens of the logged in user are
+    submitted, so listens are never sent to another account after relogin. Listens recorded while no user was logged in
+    are submitted for the next user who logs in.
+
+    Journal format is one JSON object per line:
+        - `{"op": "add", "id": ..., "username": ..., "title": ..., "artist": ..., "album": ..., "timestamp": ...}`
+        - `{"op": "ack", "id": ...}`
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        submit: Callable[[list[dict]], list[str] | None],
+        flush_interval: float = 1.0,
+        min_retry_delay: float = 5.0,
+        max_retry_delay: float = 600.0,
+        batch_size: int = 50,
+    ):
+        """Initialize the journal and load listens left pending from previous runs.
+
+        Args:
+            path (Path): Path to the journal file.
+            submit (Callable[[list[dict]], list[str] | None]): Sends a batch of listens to Last.fm in one request.
+                Returns IDs of the listens that are done with (scrobbled or permanently rejected), or None if the whole
+                batch should be retried later.
+            flush_interval (float, optional): Seconds between flusher runs. Defaults to 1.0.
+            min_retry_delay (float, optional): Upper bound in seconds of the first backoff delay after a failed submit.
+                Defaults to 5.0.
+            max_retry_delay (float, optional): Max upper bound in seconds of a backoff delay. Defaults to 600.0.
+            batch_size (int, optional): Max listens per submit, Last.fm accepts up to 50. Defaults to 50.
+        """
+
+        self.path = path
+        self.submit = submit
+        self.flush_interval = flush_interval
+        self.min_retry_delay = min_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.batch_size = batch_size
+        # Last.fm username of the logged in user, listens are only submitted while it's set
+        self.username = None
+
+        self._incoming = queue.SimpleQueue()
+        self._pending = {}
+        # Listen ID -> `time.monotonic()` when it was enqueued in this run, for scrobble latency
+        self._enqueued = {}
+        self._latency = registry.histogram(
+            'scrobble_latency_seconds',
+            'Time from queueing a listen to Last.fm taking it, in seconds',
+            buckets=(1, 2.5, 5, 10, 30, 60, 300, 900, 3600, 6 * 3600, 24 * 3600),
+        )
+        # Set whenever listens are added or acknowledged, and after every flush
+        self._pending_gauge = registry.gauge('scrobble_journal_pending', 'Listens waiting to be scrobbled')
+        self._records = 0
+        self._next_retry = 0.0
+        self._retry_delays = backoff_delays(min_retry_delay, max_retry_delay)
+
+        self._file_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._thread = None
+
+        self._load()
+
+    def __len__(self):
+        return len(self._pending) + self._incoming.qsize()
+
+    def _load(self) -> None:
+        """Replay the journal file to restore listens that were never acknowledged.
+
+        A truncated or corrupted line (e.g. after a crash in the middle of a write) is skipped and dropped by compaction.
+        """
+
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                self._records += 1
+                try:
+                    record = json.loads(line)
+                    op, id = record.pop('op'), record['id']
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    logger.warning('Skipping corrupted scrobble journal record: %r', line)
+                    continue
+
+                if op == 'add':
+                    self._pending[id] = record
+                elif op == 'ack':
+                    self._pending.pop(id, None)
+
+        if self._pending:
+            logger.warning('Loaded %d pending scrobbles from the journal', len(self._pending))
+        self._pending_gauge.set(len(self))
+
+        self._compact()
+
+    def _append(self, records: list[dict]) -> None:
+        """Append records to the journal file and fsync it once for the whole batch."""
+
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._records += len(records)
+
+    def _compact(self) -> None:
+        """Rewrite the journal so that it contains only pending listens.
+
+        The new journal is written to a temporary file and atomically swapped in, so a crash leaves either the old
+        or the new journal on disk.
+        """
+
+        if self._records == len(self._pending):
+            return
+
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for entry in self._pending.values():
+                file.write(json.dumps({'op': 'add', **entry}, ensure_ascii=False) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(tmp_path, self.path)
+        self._records = len(self._pending)
+
+    def _write_incoming(self) -> None:
+        """Move all enqueued listens to the journal file."""
+
+        records = []
+        while True:
+            try:
+                records.append(self._incoming.get_nowait())
+            except queue.Empty:
+                break
+
+        if not records:
+            return
+
+        with self._file_lock:
+            self._append([{'op': 'add', **entry} for entry in records])
+            for entry in records:
+                self._pending[entry['id']] = entry
+
+    def _submit_pending(self) -> None:
+        """Send pending listens to Last.fm in journal order, in batches of `batch_size`, and acknowledge the ones that are done with.
+
+        Stops at the first batch that wasn't fully done with and postpones the next attempt using capped exponential
+        backoff with jitter. Backoff is reset once a batch goes through.
+        """
+
+        with self._file_lock:
+            pending = [entry for entry in self._pending.values() if entry.get('username') in (None, self.username)]
+
+        start = time.perf_counter()
+        n_requests = n_done = 0
+        for i in range(0, len(pending), self.batch_size):
+            batch = pending[i : i + self.batch_size]
+            done = self.submit(batch)
+            n_requests += 1
+
+            if done:
+                self._retry_delays = backoff_delays(self.min_retry_delay, self.max_retry_delay)
+                with self._file_lock:
+                    self._append([{'op': 'ack', 'id': id} for id in done])
+                    for id in done:
+                        self._pending.pop(id, None)
+                        enqueued = self._enqueued.pop(id, None)
+                        if enqueued is not None:
+                            self._latency.observe(time.monotonic() - enqueued)
+                self._pending_gauge.set(len(self))
+                n_done += len(done)
+
+            if done is None or len(done) < len(batch):
+                self._next_retry = time.monotonic() + next(self._retry_delays)
+                break
+
+        if n_done:
+            with self._file_lock:
+                self._compact()
+
+            elapsed = time.perf_counter() - start
+            logger.info(
+                'Submitted %d scrobbles in %d requests, %.2f s (%.1f scrobbles/s)', n_done, n_requests, elapsed, n_done / elapsed
+            )
+
+    def enqueue(self, title: str, artist: str, album: str, timestamp: int) -> None:
+        """Queue a listen for scrobbling.
+
+        Only puts the listen into an in-memory queue, the flusher thread writes it to disk within `flush_interval`.
+
+        Args:
+            title (str): Title of the song.
+            artist (str): Artist name.
+            album (str): Album name.
+            timestamp (int): Time the listen started, in seconds since epoch.
+        """
+
+        id = uuid.uuid4().hex
+        self._enqueued[id] = time.monotonic()
+        self._incoming.put(
+            {'id': id, 'username': self.username, 'title': title, 'artist': artist, 'album': album, 'timestamp': timestamp}
+        )
+        self._pending_gauge.set(len(self))
+
+    def flush(self, force: bool = False) -> None:
+        """Write enqueued listens to disk and try to submit pending ones.
+
+        Args:
+            force (bool, optional): If True, ignore the retry delay after a failed submit. Defaults to False.
+        """
+
+        self._write_incoming()
+
+        with self._submit_lock:
+            if self.username is not None and self._pending and (force or time.monotonic() >= self._next_retry):
+                self._submit_pending()
+
+        # Corrects a value set by `enqueue()` racing with an acknowledgment
+        self._pending_gauge.set(len(self))
+
+    def start(self, username: str) -> None:
+        """Set the logged in user and start the background flusher thread if it's not running yet.
+
+        Args:
+            username (str): Last.fm username of the logged in user.
+        """
+
+        self.username = username
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def close(self, submit: bool = True, timeout: float = 5.0) -> None:
+        """Persist everything enqueued and make a last attempt to submit pending listens.
+
+        Listens that couldn't be submitted stay in the journal and will be sent on the next start.
+
+        Args:
+            submit (bool, optional): Whether to try to submit pending listens, they are only persisted otherwise
+                (e.g., when the user isn't logged in). Defaults to True.
+            timeout (float, optional): Max seconds to wait for the flusher to finish its current submit. Defaults to 5.0.
+        """
+
+        self._write_incoming()
+
+        if not submit or self.username is None:
+            return
+
+        if self._submit_lock.acquire(timeout=timeout):
+            try:
+                if self._pending:
+                    self._submit_pending()
+            finally:
+                self._submit_lock.release()
+
+    def _run(self) -> None:
+        """Flusher loop."""
+
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                logger.error("Couldn't write the scrobble journal, path: %s", self.path, exc_info=True)
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+
+from ..resilience import CallNotMade
+
+logger = logging.getLogger(__name__)
+
+
+class Priority:
+    """Priorities of Last.fm requests, lower value is more important."""
+
+    SCROBBLE = 0
+    NOW_PLAYING = 1
+    METADATA = 2
+
+
+class RateLimitExceeded(CallNotMade):
+    """Raised when a request is dropped by the rate limiter."""
+
+    def __init__(self, priority: int):
+        super().__init__(f'Last.fm request with priority {priority} dropped by the rate limiter')
+        self.priority = priority
+
+
+class RateLimiter:
+    """Token bucket rate limiter with priorities.
+
+    Each request takes one token, tokens are refilled at `rate` per second up to `capacity`. Lower priorities can't
+    take the last tokens of the bucket (their reserve), which are left for more important requests, and give up
+    waiting for a token sooner. So under pressure metadata requests are dropped first, while scrobbles wait
+    for their turn.
+    """
+
+    # Tokens left for more important requests, and max seconds to wait for a token, by priority
+    RESERVES = {Priority.SCROBBLE: 0, Priority.NOW_PLAYING: 1, Priority.METADATA: 2}
+    MAX_WAITS = {Priority.SCROBBLE: 30.0, Priority.NOW_PLAYING: 3.0, Priority.METADATA: 1.0}
+
+    def __init__(self, rate: float = 4.0, capacity: int = 8):
+        """Initialize the limiter with a full bucket.
+
+        Args:
+            rate (float, optional): Tokens added per second. Defaults to 4.0 (Last.fm allows 5 requests per second on average).
+            capacity (int, optional): Max number of tokens in the bucket. Defaults to 8.
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+
+        self._stats = {priority: {'acquired': 0, 'dropped': 0, 'total_delay': 0.0, 'max_delay': 0.0} for priority in self.RESERVES}
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time passed since the last refill. Must be called with `_lock` held."""
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, priority: int) -> bool:
+        """Take a token for a request, waiting for it if needed.
+
+        Args:
+            priority (int): Priority of the request (one of `Priority`).
+
+        Returns:
+            bool: True if the request can be made, False if it should be dropped.
+        """
+
+        reserve, max_wait = self.RESERVES[priority], self.MAX_WAITS[priority]
+        start = time.monotonic()
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                stats = self._stats[priority]
+                if self.tokens >= reserve + 1:
+                    self.tokens -= 1
+
+                    delay = now - start
+                    stats['acquired'] += 1
+                    stats['total_delay'] += delay
+                    stats['max_delay'] = max(stats['max_delay'], delay)
+                    return True
+
+                wait = (reserve + 1 - self.tokens) / self.rate
+                if now - start + wait > max_wait:
+                    stats['dropped'] += 1
+                    logger.warning('Last.fm rate limit reached, dropping request with priority %d', priority)
+                    return False
+
+            time.sleep(wait)
+
+    def stats(self) -> dict:
+        """Get per-priority counters and queueing delays.
+
+        Returns:
+            dict: Priority to dict with 'acquired', 'dropped', 'total_delay' and 'max_delay' (in seconds).
+        """
+
+        with self._lock:
+            return {priority: dict(stats) for priority, stats in self._stats.items()}
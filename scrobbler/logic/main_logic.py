@@ -1,71 +1,101 @@
+import logging
 import time
-from math import ceil
+from typing import TYPE_CHECKING, Callable
 
 from config import Config
+from scrobbler.metrics import registry
 
-from .am import AppScraper, WebScraper
+from .engine import ScrobbleEngine
 from .lastfm import Lastfm
+from .outbound import OutboundWorker
+from .scheduler import PollScheduler
 from .song import Song
 
+if TYPE_CHECKING:
+    from .am import WebScraper
 
-def _handle_relistening(cur_time: int, song: Song, lastfm: Lastfm) -> None:
-    """Handle a song that is being relistened to.
+logger = logging.getLogger(__name__)
 
-    If the song has already been played beyond its duration (and duration is from the Apple Music app), it will be scrobbled again.
-    Resets the playtime and start timestamp, and updates the now playing status on Last.fm.
+
+def _fetch_metadata(track: Song, web_scraper: 'WebScraper', lastfm: Lastfm) -> Song:
+    """Enrich a copy of the current song with metadata from Apple Music web and Last.fm API.
+
+    Runs on the outbound worker thread.
 
     Args:
-        cur_time (int): Current time in seconds since epoch.
-        song (Song): The Song object representing the current song.
+        track (Song): Copy of the current song.
+        web_scraper (WebScraper): Apple Music web scraper.
         lastfm (Lastfm): Last.fm interface.
+
+    Returns:
+        Song: The same copy with updated metadata.
     """
 
-    if song.is_rescrobbable():
-        lastfm.scrobble_song(song)
-        song.state['started_playing_timestamp'] = int(cur_time)
-        song.state['playtime'] = 0
-        lastfm.set_now_playing(song)
+    # Get duration (if no duration from app) and artwork (if not minimal)
+    if not track.metadata.is_app_duration or not Config.MINIMAL_GUI:
+        web_scraper.update_metadata(track)
 
+    lastfm.update_metadata(track)
 
-def _handle_no_metadata(song: Song, lastfm: Lastfm) -> None:
-    """Handle the case when no metadata is detected from the Apple Music app.
+    return track
 
-    If the previous song is scrobbable, it is scrobbled. Then, the song's metadata and state are reset.
 
-    Args:
-        song (Song): The Song object representing the current song.
-        lastfm (Lastfm): Last.fm interface.
+def _resource_usage() -> tuple[float, float]:
+    """Get resident memory and CPU time used by the app.
+
+    Returns:
+        tuple[float, float]: Resident set size in MB and total (user + system) CPU time in seconds.
     """
 
-    if song.is_scrobbable():
-        lastfm.scrobble_song(song)
+    import psutil
 
-    song.reset_metadata()
-    song.reset_state()
+    process = psutil.Process()
+    cpu_times = process.cpu_times()
 
-    time.sleep(1)
+    return process.memory_info().rss / 1024 / 1024, cpu_times.user + cpu_times.system
 
 
 def scrobble_at_exit(song: Song, lastfm: Lastfm) -> None:
     """Attempt to scrobble the current song when the application exits.
 
-    Scrobbles the song if it is scrobbable or rescrobbable.
+    Queues the song if it is scrobbable or rescrobbable and makes a last attempt to send pending scrobbles,
+    if the user is logged in (without a session key Last.fm would reject them). Scrobbles that couldn't be sent
+    stay in the scrobble journal until the next start.
 
     Args:
         song (Song): The Song object representing the current song.
         lastfm (Lastfm): Last.fm interface.
     """
 
-    if song.is_scrobbable() or song.is_rescrobbable():
-        lastfm.scrobble_song(song)
+    for _, track in ScrobbleEngine(song).finish():
+        lastfm.scrobble_song(track)
+
+    lastfm.journal.close(submit=bool(lastfm.network.session_key))
 
 
-def run_background(song: Song, lastfm: Lastfm) -> None:
+def run_background(
+    song: Song,
+    lastfm: Lastfm,
+    app_scraper=None,
+    web_scraper: 'WebScraper | None' = None,
+    outbound: OutboundWorker | None = None,
+    scheduler: PollScheduler | None = None,
+    clock: Callable[[], float] = time.time,
+) -> None:
     """Main background loop to monitor Apple Music and scrobble songs.
 
     This function continuously monitors the Apple Music app for currently playing music, updates song metadata,
     handles playtime tracking, scrobbles songs to Last.fm, and sets the now playing status.
 
+    Scrobbling decisions are made by `ScrobbleEngine`, this loop only feeds it observations and performs its actions.
+    Network calls run on an `OutboundWorker` thread, so sampling of the Apple Music app is never delayed by them.
+    Scrobbles are only queued in the scrobble journal, which doesn't block either. How often the app is sampled
+    is decided by `PollScheduler` depending on the player state. While Apple Music is closed, the loop hibernates:
+    UI objects of the app are released and polling backs off to once a minute, until the app is started again.
+
+    All collaborators can be injected, which is how recorded traces are replayed (see `trace.replay()`).
+    If `TRACE_FILE` is set, observations of the Apple Music app are recorded to it.
+
     Logic:
         - Detects if a song is playing or paused.
         - Detects when a new song starts.
@@ -77,73 +107,105 @@ def run_background(song: Song, lastfm: Lastfm) -> None:
     Args:
         song (Song): The Song object representing the current song.
         lastfm (Lastfm): Last.fm interface.
+        app_scraper (optional): Source of Apple Music app observations with `update_metadata(song)`. Defaults to `AppScraper`.
+        web_scraper (WebScraper | None, optional): Apple Music web scraper. Defaults to `AsyncWebScraper`.
+        outbound (OutboundWorker | None, optional): Worker for network calls. Defaults to a threaded `OutboundWorker`.
+        scheduler (PollScheduler | None, optional): Polling scheduler. Defaults to `PollScheduler` on real time.
+        clock (Callable[[], float], optional): Current time in seconds since epoch. Defaults to `time.time`.
     """
 
-    app_scraper = AppScraper()
-    web_scraper = WebScraper()
+    # Scrapers are imported here, so they are loaded on the background thread instead of during startup.
+    # Also `pywinauto` is only available on Windows, and replays import this module from `trace`
+    if app_scraper is None:
+        from .am import AppScraper
+        from .trace import TraceRecorder
+
+        app_scraper = AppScraper()
+        registry.register_collector('app_scraper', app_scraper.stats)
+        registry.register_collector('process_tracker', app_scraper.process_tracker.stats)
+        if Config.TRACE_FILE:
+            app_scraper = TraceRecorder(app_scraper, Config.TRACE_FILE)
+
+    # Collaborators created here are closed when the loop stops (e.g., on an invalid session key, before relogin)
+    owned = []
+    if web_scraper is None:
+        from .am import AsyncWebScraper
+
+        web_scraper = AsyncWebScraper()
+        registry.register_collector('http_cache', web_scraper.http_cache.stats)
+        registry.register_collector('artwork_cache', web_scraper.artwork_cache.stats)
+        owned.append(web_scraper)
+    if outbound is None:
+        outbound = OutboundWorker()
+        owned.append(outbound)
+    scheduler = scheduler or PollScheduler()
+
+    try:
+        _poll(song, lastfm, app_scraper, web_scraper, outbound, scheduler, clock)
+    finally:
+        # The worker is stopped first, so no call uses the scraper after it's closed
+        for resource in reversed(owned):
+            resource.close()
+
+
+def _poll(
+    song: Song,
+    lastfm: Lastfm,
+    app_scraper,
+    web_scraper: 'WebScraper',
+    outbound: OutboundWorker,
+    scheduler: PollScheduler,
+    clock: Callable[[], float],
+) -> None:
+    """Polling loop of `run_background()`, runs until an exception is raised."""
+
+    registry.register_collector('outbound', outbound.stats)
+    registry.register_collector('scheduler', scheduler.stats)
+    poll_duration = registry.histogram('poll_duration_seconds', 'Duration of a polling loop iteration, without waiting, in seconds')
+    polls = registry.counter('polls_total', 'Polling loop iterations', hibernating='false')
+    hibernating_polls = registry.counter('polls_total', 'Polling loop iterations', hibernating='true')
+
+    engine = ScrobbleEngine(song)
+    hibernation = None
 
     while True:
-        # Get current song's metadata
-        is_data = app_scraper.update_metadata(song)
-
-        # No song in Apple Music window
-        if not is_data:
-            _handle_no_metadata(song, lastfm)
-            continue
+        poll_start = time.perf_counter()
 
-        # Try to set duration from the app
-        if song.metadata.get('is_app_duration', False) and not song.state.get('is_app_duration', False) and song.is_same_song():
-            song.state['duration'] = song.metadata['duration']
-            song.state['is_app_duration'] = True
+        # Apply results of finished network calls
+        outbound.process_completed()
 
-        cur_time = ceil(time.time())
-
-        # Encountered new song
-        if not song.is_same_song():
-            song.increase_playtime(cur_time)
-
-            # Try to scrobble song that was played before this one
-            if song.is_scrobbable():
-                lastfm.scrobble_song(song)
-
-            song.reset_state()
-
-            # If song is playing - get start of a listen, mark as started playing, mark as now playing on last.fm
-            if song.metadata.get('playing', False):
-                song.state['started_playing_timestamp'] = int(cur_time)
-                song.state['last_time_played'] = cur_time
-                song.state['started_playing'] = True
-                song.state['playing'] = True
-
-                lastfm.set_now_playing(song)
-
-            # Get duration (if no duration from app) and artwork (if not minimal)
-            if not song.metadata.get('is_app_duration', False) or not Config.MINIMAL_GUI:
-                web_scraper.update_metadata(song)
-
-            lastfm.update_metadata(song)
-            song.state.update(song.metadata)
-
-        # If we continue to listen to the same song
-        elif song.metadata.get('playing', False):
-            # If song was paused before that - mark as keep playing
-            if not song.state.get('playing', False):
-                lastfm.set_now_playing(song)
-                song.state['playing'] = True
-
-            # If it's a start of a listen - set timestamp and mark as started playing
-            if not song.state.get('started_playing', False):
-                song.state['started_playing_timestamp'] = int(cur_time)
-                song.state['started_playing'] = True
-
-            song.increase_playtime(cur_time)
-            _handle_relistening(cur_time, song, lastfm)
-            song.state['last_time_played'] = cur_time
-
-        # If song is the same but paused (increase will happen if last time checked song was playing)
-        else:
-            song.increase_playtime(cur_time)
-            song.state['last_time_played'] = None
-            song.state['playing'] = False
+        # Get current song's metadata
+        is_data = app_scraper.update_metadata(song)
 
-        time.sleep(0.5)
+        for action, track in engine.process(is_data, clock()):
+            if action == ScrobbleEngine.SCROBBLE:
+                lastfm.scrobble_song(track)
+            elif action == ScrobbleEngine.NOW_PLAYING:
+                outbound.submit('set_now_playing', lastfm.set_now_playing, track)
+            elif action == ScrobbleEngine.NEW_SONG:
+                outbound.submit('update_metadata', _fetch_metadata, track, web_scraper, lastfm, callback=engine.apply_metadata)
+
+        # Let GUI see the changes
+        song.publish()
+
+        # Hibernate while Apple Music is closed, wake up as soon as it's found again
+        app_running = is_data or app_scraper.is_app_running()
+        if not app_running and hibernation is None:
+            app_scraper.release()
+            hibernation = (clock(), *_resource_usage())
+            logger.info('Apple Music is not running, hibernating (RSS: %.1f MB, CPU time: %.1f s)', *hibernation[1:])
+        elif app_running and hibernation is not None:
+            started, _, cpu_time = hibernation
+            rss, cur_cpu_time = _resource_usage()
+            logger.info(
+                'Apple Music is running, waking up after %.0f s of hibernation (RSS: %.1f MB, CPU time while hibernating: %.2f s)',
+                clock() - started,
+                rss,
+                cur_cpu_time - cpu_time,
+            )
+            hibernation = None
+
+        poll_duration.observe(time.perf_counter() - poll_start)
+        (polls if hibernation is None else hibernating_polls).inc()
+
+        scheduler.wait(scheduler.next_interval(song, is_data, hibernating=hibernation is not None))
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundWorker:
+    """Runs network calls (Last.fm API, Apple Music web) on a dedicated thread, so the polling loop never blocks on I/O.
+
+    Calls are put into a bounded queue and executed one by one in submission order. Results are handed back to the
+    polling thread through callbacks, which run when the polling thread calls `process_completed()`, so the `Song`
+    object is only ever mutated by the polling thread.
+
+    With `threaded=False` calls run right away on the submitting thread (callbacks still wait for `process_completed()`),
+    which makes replays of recorded traces deterministic.
+    """
+
+    def __init__(self, maxsize: int = 32, slow_call_threshold: float = 5.0, threaded: bool = True):
+        """Initialize the worker and start its thread.
+
+        Args:
+            maxsize (int, optional): Max number of calls waiting in the queue. Defaults to 32.
+            slow_call_threshold (float, optional): Calls taking longer than this many seconds are logged. Defaults to 5.0.
+            threaded (bool, optional): Whether to run calls on the worker thread. Defaults to True.
+        """
+
+        self.slow_call_threshold = slow_call_threshold
+
+        self._commands = queue.Queue(maxsize=maxsize)
+        self._completed = queue.SimpleQueue()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        self.threaded = threaded
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _call_stats(self, name: str) -> dict:
+        """Get stats entry of a call, creating it if needed. Must be called with `_stats_lock` held."""
+
+        if name not in self._stats:
+            self._stats[name] = {'calls': 0, 'errors': 0, 'dropped': 0, 'total_time': 0.0, 'max_time': 0.0, 'last_time': 0.0}
+        return self._stats[name]
+
+    def submit(self, name: str, func: Callable, *args, callback: Callable[[Any], None] | None = None) -> bool:
+        """Queue a call to run on the worker thread.
+
+        Args:
+            name (str): Name of the call, used in stats and logs.
+            func (Callable): Function to call.
+            *args: Arguments for the function.
+            callback (Callable[[Any], None] | None, optional): Called with the function's result from `process_completed()`.
+                Defaults to None.
+
+        Returns:
+            bool: True if the call was queued, False if the queue is full and the call was dropped.
+        """
+
+        if not self.threaded:
+            self._execute(name, func, args, callback)
+            return True
+
+        try:
+            self._commands.put_nowait((name, func, args, callback))
+        except queue.Full:
+            logger.warning('Outbound queue is full, dropping %s call', name)
+            with self._stats_lock:
+                self._call_stats(name)['dropped'] += 1
+            return False
+
+        return True
+
+    def process_completed(self) -> None:
+        """Run callbacks of finished calls on the calling thread.
+
+        Raises:
+            Exception: Exception raised by a call on the worker thread, re-raised on the calling thread.
+        """
+
+        while True:
+            try:
+                callback, result, error = self._completed.get_nowait()
+            except queue.Empty:
+                return
+
+            if error is not None:
+                raise error
+            if callback is not None:
+                callback(result)
+
+    def stats(self) -> dict:
+        """Get current queue depth and per-call latency stats.
+
+        Returns:
+            dict: 'queue_depth' and 'calls' - dict of call name to its counters ('calls', 'errors', 'dropped')
+                and latencies in seconds ('total_time', 'max_time', 'last_time').
+        """
+
+        with self._stats_lock:
+            return {
+                'queue_depth': self._commands.qsize(),
+                'calls': {name: dict(call_stats) for name, call_stats in self._stats.items()},
+            }
+
+    def _execute(self, name: str, func: Callable, args: tuple, callback: Callable[[Any], None] | None) -> None:
+        """Run a call, record its stats and hand its result over to `process_completed()`."""
+
+        result = error = None
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            error = e
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            call_stats = self._call_stats(name)
+            call_stats['calls'] += 1
+            call_stats['errors'] += error is not None
+            call_stats['total_time'] += elapsed
+            call_stats['max_time'] = max(call_stats['max_time'], elapsed)
+            call_stats['last_time'] = elapsed
+
+        if elapsed > self.slow_call_threshold:
+            logger.warning('Slow outbound %s call: %.1f s, queue depth: %d', name, elapsed, self._commands.qsize())
+
+        if callback is not None or error is not None:
+            self._completed.put((callback, result, error))
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Drop queued calls and stop the worker thread once its current call is done.
+
+        Args:
+            timeout (float, optional): Max seconds to wait for the current call. Defaults to 30.0.
+        """
+
+        if self._thread is None:
+            return
+
+        while True:
+            try:
+                self._commands.get_nowait()
+            except queue.Empty:
+                break
+
+        self._commands.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Worker loop, runs until `close()`."""
+
+        while (command := self._commands.get()) is not None:
+            self._execute(*command)
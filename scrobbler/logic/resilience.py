@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Iterator
+
+from scrobbler.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Names of the circuit breakers for the endpoints the app talks to
+LASTFM = 'lastfm'
+APPLE_MUSIC = 'apple_music'
+
+
+class CallNotMade(Exception):
+    """Base of exceptions raised when a call never reached the endpoint, e.g. it was rejected by a circuit breaker or a rate limiter."""
+
+
+class CircuitOpenError(CallNotMade):
+    """Raised instead of making a call to an endpoint whose circuit breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker.
+
+    States:
+        - closed: calls go through, consecutive failures are counted.
+        - open: after `failure_threshold` consecutive failures calls are rejected for `reset_timeout` seconds.
+        - half-open: after the timeout a single probe call is let through. Success closes the breaker,
+          failure opens it again with the timeout doubled (up to `max_reset_timeout`).
+
+    State changes are logged.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0, max_reset_timeout: float = 600.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.reset_timeout = reset_timeout
+        self.opened_at = 0.0
+        self.probing = False
+        self._prober = None
+
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f'{self.name}: {self.state}, {self.failures} failures'
+
+    def _set_state(self, state: str) -> None:
+        """Change state and log it. Must be called with `_lock` held."""
+
+        if state != self.state:
+            logger.warning(
+                "Circuit breaker '%s': %s -> %s (failures: %d, reset timeout: %.0f s)",
+                self.name,
+                self.state,
+                state,
+                self.failures,
+                self.reset_timeout,
+            )
+            self.state = state
+
+    def allow(self, caller: object = None) -> bool:
+        """Check whether a call can be made now.
+
+        Args:
+            caller (object, optional): Token of the call, passed to `end_call()` as well. Defaults to None.
+
+        Returns:
+            bool: True if the breaker is closed or this call is the half-open probe, False otherwise.
+        """
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+                self.probing = False
+
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                self._prober = caller
+                return True
+
+            return False
+
+    def end_call(self, caller: object) -> None:
+        """Finish a call allowed by `allow()`. If it was the half-open probe and its outcome wasn't recorded
+        (e.g., the call wasn't made or was interrupted), another probe is let through.
+
+        Args:
+            caller (object): Token of the call passed to `allow()`.
+        """
+
+        with self._lock:
+            if self.probing and self._prober is caller:
+                self.probing = False
+                self._prober = None
+
+    def record_success(self) -> None:
+        """Record a call that reached the endpoint."""
+
+        with self._lock:
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self.probing = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a call that failed to reach the endpoint."""
+
+        with self._lock:
+            self.failures += 1
+
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            elif self.failures < self.failure_threshold:
+                return
+
+            self.opened_at = time.monotonic()
+            self.probing = False
+            self._set_state(self.OPEN)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get the shared circuit breaker of an endpoint, creating it on first use.
+
+    Args:
+        name (str): Name of the endpoint (e.g. `LASTFM`, `APPLE_MUSIC`).
+
+    Returns:
+        CircuitBreaker: Circuit breaker of the endpoint.
+    """
+
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def backoff_delays(base: float, cap: float) -> Iterator[float]:
+    """Generate capped exponential backoff delays with full jitter.
+
+    The n-th delay is a random value between 0 and `min(cap, base * 2 ** n)`.
+
+    Args:
+        base (float): Upper bound of the first delay in seconds.
+        cap (float): Max upper bound of a delay in seconds.
+
+    Yields:
+        float: Delay in seconds.
+    """
+
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(cap, base * 2**attempt))
+        attempt += 1
+
+
+def call_with_retry(
+    func: Callable,
+    *args,
+    breaker: CircuitBreaker,
+    retry_on: tuple[type[Exception], ...],
+    attempts: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 5.0,
+    **kwargs,
+):
+    """Call a function that talks to an endpoint, retrying with backoff and going through the endpoint's circuit breaker.
+
+    Exceptions from `retry_on` are failures to reach the endpoint: they are retried and counted by the breaker.
+    `CallNotMade` (e.g., a request dropped by a rate limiter inside the function) means the endpoint wasn't called,
+    so it isn't counted. Any other exception means the endpoint responded, so it counts as a success for the breaker.
+    Both are re-raised as is.
+
+    Args:
+        func (Callable): Function to call.
+        *args: Arguments for the function.
+        breaker (CircuitBreaker): Circuit breaker of the endpoint.
+        retry_on (tuple[type[Exception], ...]): Exceptions to retry on.
+        attempts (int, optional): Max number of attempts. Defaults to 3.
+        base_delay (float, optional): Upper bound of the first backoff delay in seconds. Defaults to 0.5.
+        max_delay (float, optional): Max upper bound of a backoff delay in seconds. Defaults to 5.0.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        Result of the function.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        Exception: Last exception from `retry_on` if all attempts failed, or any other exception raised by the function.
+    """
+
+    delays = backoff_delays(base_delay, max_delay)
+    for attempt in range(1, attempts + 1):
+        caller = object()
+        if not breaker.allow(caller):
+            raise CircuitOpenError(breaker.name)
+
+        try:
+            result = func(*args, **kwargs)
+        except retry_on:
+            breaker.record_failure()
+            if attempt == attempts:
+                raise
+        except CallNotMade:
+            raise
+        except Exception:
+            breaker.record_success()
+            raise
+        else:
+            breaker.record_success()
+            return result
+        finally:
+            breaker.end_call(caller)
+
+        registry.counter('retries_total', 'Retried calls to endpoints', endpoint=breaker.name).inc()
+        time.sleep(next(delays))
+
+
+async def call_with_retry_async(
+    func: Callable[..., Awaitable],
+    *args,
+    breaker: CircuitBreaker,
+    retry_on: tuple[type[Exception], ...],
+    attempts: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 5.0,
+    **kwargs,
+):
+    """Coroutine version of `call_with_retry()`, backoff delays don't block the event loop.
+
+    Args:
+        func (Callable[..., Awaitable]): Coroutine function to call.
+        *args: Arguments for the function.
+        breaker (CircuitBreaker): Circuit breaker of the endpoint.
+        retry_on (tuple[type[Exception], ...]): Exceptions to retry on.
+        attempts (int, optional): Max number of attempts. Defaults to 3.
+        base_delay (float, optional): Upper bound of the first backoff delay in seconds. Defaults to 0.5.
+        max_delay (float, optional): Max upper bound of a backoff delay in seconds. Defaults to 5.0.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        Result of the function.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        Exception: Last exception from `retry_on` if all attempts failed, or any other exception raised by the function.
+    """
+
+    delays = backoff_delays(base_delay, max_delay)
+    for attempt in range(1, attempts + 1):
+        caller = object()
+        if not breaker.allow(caller):
+            raise CircuitOpenError(breaker.name)
+
+        try:
+            result = await func(*args, **kwargs)
+        except retry_on:
+            breaker.record_failure()
+            if attempt == attempts:
+                raise
+        except CallNotMade:
+            raise
+        except Exception:
+            breaker.record_success()
+            raise
+        else:
+            breaker.record_success()
+            return result
+        finally:
+            breaker.end_call(caller)
+
+        registry.counter('retries_total', 'Retried calls to endpoints', endpoint=breaker.name).inc()
+        await asyncio.sleep(next(delays))
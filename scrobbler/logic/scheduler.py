@@ -0,0 +1,121 @@
+import time
+from typing import Callable
+
+from .song import Song
+
+
+class PollScheduler:
+    """Deadline-based scheduler of the polling loop that adapts the sampling interval to the player state.
+
+    - Playing: `PLAYING_INTERVAL`, tightened to `MIN_INTERVAL` within `NEAR_WINDOW` seconds of the scrobble threshold
+      and of the end of the track, where state changes matter the most.
+    - Paused: `PAUSED_INTERVAL`.
+    - No song in Apple Music: starts at `IDLE_MIN_INTERVAL` and doubles on every idle poll up to `IDLE_MAX_INTERVAL`.
+    - Apple Music is closed (hibernation): starts at `HIBERNATE_MIN_INTERVAL` and doubles up to `HIBERNATE_MAX_INTERVAL`.
+
+    Wakeups are scheduled on deadlines (previous deadline + interval), so time spent polling doesn't add up to the interval.
+    Overruns (polling took longer than the interval) and jitter (how late the loop woke up) are recorded in stats.
+    """
+
+    MIN_INTERVAL = 0.5
+    PLAYING_INTERVAL = 1.0
+    PAUSED_INTERVAL = 2.0
+    IDLE_MIN_INTERVAL = 1.0
+    IDLE_MAX_INTERVAL = 10.0
+    HIBERNATE_MIN_INTERVAL = 2.0
+    HIBERNATE_MAX_INTERVAL = 60.0
+    NEAR_WINDOW = 5
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """Initialize the scheduler.
+
+        Args:
+            clock (Callable[[], float], optional): Monotonic clock in seconds. Defaults to `time.monotonic`.
+            sleep (Callable[[float], None], optional): Sleep function. Defaults to `time.sleep`.
+        """
+
+        self.clock = clock
+        self.sleep = sleep
+
+        self.idle_interval = self.IDLE_MIN_INTERVAL
+        self.hibernate_interval = self.HIBERNATE_MIN_INTERVAL
+        self.deadline = None
+
+        self.wakeups = 0
+        self.overruns = 0
+        self.total_jitter = 0.0
+        self.max_jitter = 0.0
+
+    def next_interval(self, song: Song, is_data: bool, hibernating: bool = False) -> float:
+        """Choose interval until the next poll.
+
+        Args:
+            song (Song): The Song object representing the current song.
+            is_data (bool): Whether the last poll found a song in Apple Music.
+            hibernating (bool, optional): Whether Apple Music is closed. Defaults to False.
+
+        Returns:
+            float: Interval in seconds.
+        """
+
+        if hibernating:
+            interval = self.hibernate_interval
+            self.hibernate_interval = min(self.hibernate_interval * 2, self.HIBERNATE_MAX_INTERVAL)
+            return interval
+
+        self.hibernate_interval = self.HIBERNATE_MIN_INTERVAL
+
+        if not is_data:
+            interval = self.idle_interval
+            self.idle_interval = min(self.idle_interval * 2, self.IDLE_MAX_INTERVAL)
+            return interval
+
+        self.idle_interval = self.IDLE_MIN_INTERVAL
+
+        if not song.metadata.playing:
+            return self.PAUSED_INTERVAL
+
+        playtime, duration = song.state.playtime, song.state.duration
+        to_threshold, to_end = duration // 2 - playtime, duration - playtime
+        if 0 <= to_threshold <= self.NEAR_WINDOW or to_end <= self.NEAR_WINDOW:
+            return self.MIN_INTERVAL
+
+        return self.PLAYING_INTERVAL
+
+    def wait(self, interval: float) -> None:
+        """Sleep until the next deadline, `interval` seconds after the previous one.
+
+        If the deadline has already passed, it's counted as an overrun and the schedule restarts from now.
+
+        Args:
+            interval (float): Interval in seconds.
+        """
+
+        now = self.clock()
+        self.deadline = now + interval if self.deadline is None else self.deadline + interval
+
+        if self.deadline <= now:
+            self.overruns += 1
+            self.deadline = now
+            return
+
+        self.sleep(self.deadline - now)
+
+        jitter = max(self.clock() - self.deadline, 0.0)
+        self.wakeups += 1
+        self.total_jitter += jitter
+        self.max_jitter = max(self.max_jitter, jitter)
+
+    def stats(self) -> dict:
+        """Get scheduling stats.
+
+        Returns:
+            dict: Number of 'wakeups' and 'overruns', 'mean_jitter' and 'max_jitter' in seconds.
+        """
+
+        return {
+            'wakeups': self.wakeups,
+            'overruns': self.overruns,
+            'mean_jitter': self.total_jitter / self.wakeups if self.wakeups else 0.0,
+            'max_jitter': self.max_jitter,
+        }
@@ -1,56 +1,182 @@
+from typing import Callable, NamedTuple
+
+from PIL import Image
+
+
+class Track:
+    """Information about a track as seen in the Apple Music app (e.g., title, artist, artwork, duration)."""
+
+    __slots__ = ('title', 'artist', 'id', 'album', 'artwork', 'duration', 'is_app_duration', 'playing')
+
+    def __init__(self):
+        self.reset()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields())})'
+
+    @classmethod
+    def _fields(cls) -> tuple[str, ...]:
+        """Get names of all slots of the class, including inherited ones."""
+
+        return tuple(name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ()))
+
+    def reset(self) -> None:
+        """Reset to default empty values."""
+
+        self.title = ''
+        self.artist = ''
+        self.id = ''
+        self.album = ''
+        self.artwork = None
+        self.duration = 0
+        self.is_app_duration = False
+        self.playing = False
+
+    def assign(self, track: 'Track') -> None:
+        """Copy track information (but not listening state) from another track.
+
+        Args:
+            track (Track): Track to copy from.
+        """
+
+        self.title = track.title
+        self.artist = track.artist
+        self.id = track.id
+        self.album = track.album
+        self.artwork = track.artwork
+        self.duration = track.duration
+        self.is_app_duration = track.is_app_duration
+        self.playing = track.playing
+
+    def copy(self) -> 'Track':
+        """Return a copy of the track.
+
+        Returns:
+            Track: New Track object with the same values.
+        """
+
+        track = object.__new__(Track)
+        track.assign(self)
+        return track
+
+
+class ListenState(Track):
+    """Track that is being listened to, with playing status, playtime and timestamps."""
+
+    __slots__ = ('playtime', 'started_playing', 'started_playing_timestamp', 'last_time_played')
+
+    def reset(self) -> None:
+        """Reset to default empty values."""
+
+        super().reset()
+        self.playtime = 0
+        self.started_playing = False
+        self.started_playing_timestamp = None
+        self.last_time_played = None
+
+    def copy(self) -> 'ListenState':
+        """Return a copy of the state.
+
+        Returns:
+            ListenState: New ListenState object with the same values.
+        """
+
+        state = object.__new__(ListenState)
+        state.assign(self)
+        state.playtime = self.playtime
+        state.started_playing = self.started_playing
+        state.started_playing_timestamp = self.started_playing_timestamp
+        state.last_time_played = self.last_time_played
+        return state
+
+
+class SongSnapshot(NamedTuple):
+    """Immutable view of the current song for other threads (e.g., GUI)."""
+
+    id: str = ''
+    title: str = ''
+    artist: str = ''
+    album: str = ''
+    artwork: Image.Image | None = None
+    playing: bool = False
+
+
 class Song:
     """Represents a song currently visible in the Apple Music app.
 
+    `metadata` and `state` are only mutated by the background (polling) thread. Other threads read `snapshot`,
+    which is replaced as a whole by `publish()`, so they never see a half-updated song, or subscribe to be notified
+    about new snapshots.
+
     Attributes:
-        metadata (dict): Information about the song (e.g., title, artist, artwork, duration).
-        state (dict): Current state of the song in the Apple Music app (e.g., playing status, playtime, timestamps).
+        metadata (Track): Information about the song (e.g., title, artist, artwork, duration).
+        state (ListenState): Current state of the song in the Apple Music app (e.g., playing status, playtime, timestamps).
+        snapshot (SongSnapshot): Last published view of the song.
     """
 
-    def __init__(self):
-        self.metadata = {}
-        self.reset_metadata()
+    __slots__ = ('metadata', 'state', 'snapshot', 'listeners')
+
+    # Duration used when it's unknown from the app, Apple Music web and Last.fm
+    DEFAULT_DURATION = 120
 
-        self.state = {}
-        self.reset_state()
+    def __init__(self):
+        self.metadata = Track()
+        self.state = ListenState()
+        self.snapshot = SongSnapshot()
+        self.listeners = []
 
     def __str__(self):
-        return self.metadata.get('id', '')
+        return self.metadata.id
+
+    def copy(self) -> 'Song':
+        """Return a copy of the song that can be safely handed to another thread.
+
+        Returns:
+            Song: New Song object with copies of metadata and state.
+        """
+
+        song = object.__new__(Song)
+        song.metadata = self.metadata.copy()
+        song.state = self.state.copy()
+        song.snapshot = self.snapshot
+        song.listeners = []
+        return song
+
+    def subscribe(self, listener: Callable[[SongSnapshot], None]) -> None:
+        """Register a function to be called with every new snapshot.
+
+        Listeners are called on the background thread, so they must only hand the snapshot over (e.g., to a queue).
+
+        Args:
+            listener (Callable[[SongSnapshot], None]): Function to call.
+        """
+
+        self.listeners.append(listener)
+
+    def publish(self) -> None:
+        """Publish a new snapshot of the song's metadata and notify listeners, if it changed since the last one."""
+
+        metadata, snapshot = self.metadata, self.snapshot
+        if (
+            metadata.id != snapshot.id
+            or metadata.playing != snapshot.playing
+            or metadata.artwork is not snapshot.artwork
+            or metadata.title != snapshot.title
+            or metadata.artist != snapshot.artist
+        ):
+            self.snapshot = SongSnapshot(metadata.id, metadata.title, metadata.artist, metadata.album, metadata.artwork, metadata.playing)
+            for listener in self.listeners:
+                listener(self.snapshot)
 
     def reset_metadata(self) -> None:
         """Reset metadata to default empty values."""
 
-        self.metadata.update(
-            {
-                'title': '',
-                'artist': '',
-                'id': '',
-                'album': '',
-                'artwork': None,
-                'duration': 0,
-                'is_app_duration': False,
-                'playing': False,
-            }
-        )
+        self.metadata.reset()
 
     def reset_state(self) -> None:
         """Reset state to default empty values."""
 
-        self.state.update(
-            {
-                'title': '',
-                'artist': '',
-                'id': '',
-                'album': '',
-                'artwork': None,
-                'duration': 0,
-                'is_app_duration': False,
-                'playtime': 0,
-                'started_playing': False,
-                'started_playing_timestamp': None,
-                'last_time_played': None,
-                'playing': False,
-            }
-        )
+        self.state.reset()
 
     def is_same_song(self, id: str = None) -> bool:
         """Check if the current song metadata matches the last known state.
@@ -63,8 +189,8 @@ class Song:
         """
 
         if id is None:
-            return self.metadata.get('id', '') == self.state.get('id', '')
-        return id == self.state.get('id', '')
+            return self.metadata.id == self.state.id
+        return id == self.state.id
 
     def is_scrobbable(self) -> bool:
         """Check if the song is eligible for scrobbling.
@@ -77,7 +203,7 @@ class Song:
             bool: True if scrobble conditions are met, False otherwise.
         """
 
-        return self.state.get('id', '') and self.state.get('playtime', 0) >= self.state.get('duration', 0) // 2
+        return bool(self.state.id) and self.state.playtime >= self.state.duration // 2
 
     def is_rescrobbable(self) -> bool:
         """Check if the song is eligible for rescrobbling.
@@ -90,7 +216,7 @@ class Song:
             bool: True if rescrobble conditions are met, False otherwise.
         """
 
-        return self.state.get('is_app_duration', False) and self.state.get('playtime', 0) > self.state.get('duration', 0)
+        return self.state.is_app_duration and self.state.playtime > self.state.duration
 
     def increase_playtime(self, cur_time: int) -> None:
         """Increase playtime if the song was previously playing.
@@ -102,5 +228,5 @@ class Song:
             - Uses 'last_time_played' to calculate elapsed time since last check.
         """
 
-        if self.state.get('last_time_played'):
-            self.state['playtime'] += cur_time - self.state['last_time_played']
+        if self.state.last_time_played:
+            self.state.playtime += cur_time - self.state.last_time_played
@@ -0,0 +1,335 @@
+"""Record and replay of Apple Music app observations.
+
+`TraceRecorder` wraps `AppScraper` and writes what it sees to a trace file, `replay()` feeds a trace through
+`run_background()` on a virtual clock, with Last.fm and Apple Music web replaced by stand-ins that only record calls.
+So real listening sessions can be replayed anywhere (no Apple Music app or `pywinauto` needed) to reproduce
+scrobbling bugs or to benchmark the polling loop:
+
+    python -m scrobbler.logic.trace trace.jsonl --speed 0
+
+Trace file is JSON lines, one array per line, written only when an observation changes (or every `HEARTBEAT` seconds):
+    - `[time]` - no song in the app.
+    - `[time, playing, duration, is_app_duration, title, artist, album]` - a new song.
+    - `[time, playing, duration, is_app_duration]` - the same song as in the previous record.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+from .outbound import OutboundWorker
+from .scheduler import PollScheduler
+from .song import Song
+
+# Max seconds between records of the same observation. When replaying, a record older than twice that means
+# the app (or the scrobbler) was closed
+HEARTBEAT = 60
+
+
+class TraceRecorder:
+    """Wrapper of an app scraper that records its observations to a trace file."""
+
+    def __init__(self, scraper, path: str | Path, clock: Callable[[], float] = time.time):
+        """Open the trace file for appending.
+
+        Args:
+            scraper: App scraper to wrap, e.g. `AppScraper`.
+            path (str | Path): Path to the trace file.
+            clock (Callable[[], float], optional): Current time in seconds since epoch. Defaults to `time.time`.
+        """
+
+        self.scraper = scraper
+        self.clock = clock
+
+        self.file = open(path, 'a', encoding='utf-8', buffering=1)
+        self.last_observation = None
+        self.last_id = None
+        self.last_record_time = 0.0
+
+    def update_metadata(self, song: Song) -> bool:
+        """Update song metadata with the wrapped scraper and record the observation.
+
+        Args:
+            song (Song): Song object to update.
+
+        Returns:
+            bool: Result of the wrapped scraper.
+        """
+
+        is_data = self.scraper.update_metadata(song)
+        now = self.clock()
+
+        if is_data:
+            metadata = song.metadata
+            observation = (metadata.id, int(metadata.playing), metadata.duration, int(metadata.is_app_duration))
+        else:
+            observation = None
+
+        if observation != self.last_observation or now - self.last_record_time >= HEARTBEAT:
+            record = [round(now, 2)]
+            if is_data:
+                record.extend(observation[1:])
+
+                # Title and artist are taken right after a song change, before they are corrected by Last.fm
+                if metadata.id != self.last_id:
+                    record.extend((metadata.title, metadata.artist, metadata.album))
+
+            self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self.last_observation = observation
+            self.last_id = observation[0] if is_data else None
+            self.last_record_time = now
+
+        return is_data
+
+    def is_app_running(self) -> bool:
+        """Check whether Apple Music is running with the wrapped scraper."""
+
+        return self.scraper.is_app_running()
+
+    def release(self) -> None:
+        """Release UI objects of the wrapped scraper."""
+
+        self.scraper.release()
+
+
+def read_trace(path: str | Path) -> list[list]:
+    """Read records of a trace file, skipping corrupted lines.
+
+    Args:
+        path (str | Path): Path to the trace file.
+
+    Returns:
+        list[list]: Records in file order.
+    """
+
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, list) and len(record) in (1, 4, 7):
+                records.append(record)
+
+    return records
+
+
+class TraceEnded(Exception):
+    """Raised by `TraceReplayer` when the trace is over."""
+
+
+class VirtualClock:
+    """Clock that only moves forward when `sleep()` is called.
+
+    Optionally really sleeps for the virtual time divided by `speed`, e.g. `speed=1000` replays an hour in 3.6 s.
+    """
+
+    def __init__(self, start: float, speed: float = 0.0):
+        """Initialize the clock.
+
+        Args:
+            start (float): Starting time in seconds since epoch.
+            speed (float, optional): Replay speed relative to real time, 0 - don't sleep at all. Defaults to 0.0.
+        """
+
+        self.now = start
+        self.speed = speed
+
+    def time(self) -> float:
+        """Get current virtual time."""
+
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Move virtual time forward."""
+
+        self.now += seconds
+        if self.speed:
+            time.sleep(seconds / self.speed)
+
+
+class TraceReplayer:
+    """App scraper stand-in that serves observations of a trace at the time of a virtual clock."""
+
+    def __init__(self, records: list[list], clock: VirtualClock):
+        """Initialize the replayer.
+
+        Args:
+            records (list[list]): Records of a trace.
+            clock (VirtualClock): Clock of the replay.
+        """
+
+        self.records = records
+        self.clock = clock
+
+        self.index = 0
+        self.song_info = tuple(records[0][4:]) if records and len(records[0]) == 7 else ('', '', '')
+        self.polls = 0
+
+    def update_metadata(self, song: Song) -> bool:
+        """Update song metadata the way `AppScraper.update_metadata()` does, from the record current at the clock's time.
+
+        Args:
+            song (Song): Song object to update.
+
+        Returns:
+            bool: True if there was a song in the app, False otherwise.
+
+        Raises:
+            TraceEnded: If the clock is past the last record.
+        """
+
+        now = self.clock.time()
+        if not self.records or now > self.records[-1][0] + HEARTBEAT:
+            raise TraceEnded
+
+        while self.index + 1 < len(self.records) and self.records[self.index + 1][0] <= now:
+            self.index += 1
+            if len(self.records[self.index]) == 7:
+                self.song_info = tuple(self.records[self.index][4:])
+
+        self.polls += 1
+
+        record = self.records[self.index]
+        if len(record) == 1 or now - record[0] > 2 * HEARTBEAT:
+            return False
+
+        _, playing, duration, is_app_duration = record[:4]
+        title, artist, album = self.song_info
+
+        id = f'{artist} - {title}'
+        if not song.is_same_song(id=id):
+            song.metadata.title = title
+            song.metadata.artist = artist
+            song.metadata.id = id
+            song.metadata.album = album
+            song.metadata.artwork = None
+
+        song.metadata.playing = bool(playing)
+        song.metadata.duration = duration
+        song.metadata.is_app_duration = bool(is_app_duration)
+
+        return True
+
+    def is_app_running(self) -> bool:
+        """Check whether Apple Music was running at the clock's time, i.e. the trace has a recent record."""
+
+        return bool(self.records) and self.clock.time() - self.records[self.index][0] <= 2 * HEARTBEAT
+
+    def release(self) -> None:
+        pass
+
+
+class _NullWebScraper:
+    """Apple Music web scraper stand-in that fetches nothing."""
+
+    def update_metadata(self, song: Song) -> None:
+        pass
+
+
+class _NullJournal:
+    """Scrobble journal stand-in."""
+
+    def close(self, submit: bool = True, timeout: float | None = None) -> None:
+        pass
+
+
+class _NullNetwork:
+    """`pylast.LastFMNetwork` stand-in of a logged in user."""
+
+    session_key = 'replay'
+
+
+class ReplayLastfm:
+    """`Lastfm` stand-in that records scrobbles and now playing updates instead of sending them."""
+
+    def __init__(self):
+        self.scrobbles = []
+        self.now_playing = []
+        self.network = _NullNetwork()
+        self.journal = _NullJournal()
+
+    def scrobble_song(self, song: Song) -> None:
+        self.scrobbles.append(
+            {
+                'title': song.state.title,
+                'artist': song.state.artist,
+                'album': song.state.album,
+                'timestamp': song.state.started_playing_timestamp,
+            }
+        )
+
+    def set_now_playing(self, song: Song) -> None:
+        self.now_playing.append({'title': song.metadata.title, 'artist': song.metadata.artist})
+
+    def update_metadata(self, song: Song) -> None:
+        if not song.metadata.duration:
+            song.metadata.duration = Song.DEFAULT_DURATION
+
+
+def replay(path: str | Path, speed: float = 0.0) -> dict:
+    """Replay a trace through `run_background()`.
+
+    Args:
+        path (str | Path): Path to the trace file.
+        speed (float, optional): Replay speed relative to real time, 0 - as fast as possible. Defaults to 0.0.
+
+    Returns:
+        dict: 'scrobbles' and 'now_playing' calls, number of 'polls', replayed 'virtual_time' and 'elapsed' real time in seconds.
+    """
+
+    from .main_logic import run_background, scrobble_at_exit
+
+    records = read_trace(path)
+    start = records[0][0] if records else 0.0
+    clock = VirtualClock(start, speed)
+    scraper = TraceReplayer(records, clock)
+    lastfm = ReplayLastfm()
+    song = Song()
+
+    started = time.perf_counter()
+    try:
+        run_background(
+            song,
+            lastfm,
+            app_scraper=scraper,
+            web_scraper=_NullWebScraper(),
+            outbound=OutboundWorker(threaded=False),
+            scheduler=PollScheduler(clock=clock.time, sleep=clock.sleep),
+            clock=clock.time,
+        )
+    except TraceEnded:
+        scrobble_at_exit(song, lastfm)
+
+    return {
+        'scrobbles': lastfm.scrobbles,
+        'now_playing': lastfm.now_playing,
+        'polls': scraper.polls,
+        'virtual_time': clock.now - start,
+        'elapsed': time.perf_counter() - started,
+    }
+
+
+def main() -> None:
+    """Replay a trace file and print resulting scrobbles as JSON lines, followed by a summary."""
+
+    parser = argparse.ArgumentParser(description='Replay a trace of the Apple Music app through the scrobbling loop.')
+    parser.add_argument('trace', type=Path, help='trace file recorded with TRACE_FILE')
+    parser.add_argument('--speed', type=float, default=1000.0, help='replay speed relative to real time, 0 - as fast as possible')
+    args = parser.parse_args()
+
+    result = replay(args.trace, args.speed)
+    for scrobble in result['scrobbles']:
+        print(json.dumps(scrobble, ensure_ascii=False))
+
+    print(
+        f"{len(result['scrobbles'])} scrobbles, {len(result['now_playing'])} now playing updates, {result['polls']} polls, "
+        f"{result['virtual_time']:.0f} s replayed in {result['elapsed']:.2f} s"
+    )
+
+
+if __name__ == '__main__':
+    main()
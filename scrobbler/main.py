@@ -1,21 +1,89 @@
+import time
+
+# Taken before any other import, so startup profile covers the whole startup
+STARTED = time.perf_counter()
+
+import argparse
 import logging
 import sys
 
-from config import Config, ensure_directories
-from scrobbler.gui import App
-from scrobbler.utils import single_instance
+from scrobbler.profiling import StartupProfiler
 
 logger = logging.getLogger(__name__)
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments, unknown ones are ignored.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(prog='AMScrobbler')
+    parser.add_argument('--profile-startup', action='store_true', help='write import times and time to first frame to the data directory')
+    args, _ = parser.parse_known_args()
+    return args
+
+
 def main():
     """Entry point of the application."""
 
+    profiler = None
+    if parse_args().profile_startup:
+        profiler = StartupProfiler(STARTED)
+        profiler.start()
+
+    # Imported here, so the profiler sees them
+    from config import Config, ensure_directories
+    from scrobbler import metrics
+    from scrobbler.gui import App
+    from scrobbler.utils import single_instance
+
     logging.basicConfig(level=logging.WARNING, filename=Config.LOG_FILE, format='[%(asctime)s] %(levelname)s: %(message)s', force=True)
     single_instance()
     ensure_directories()
 
-    App().mainloop()
+    if Config.METRICS_PORT:
+        metrics.start_http_server(Config.METRICS_PORT)
+    if Config.METRICS_SNAPSHOT_INTERVAL:
+        metrics.start_snapshots(Config.METRICS_FILE, Config.METRICS_SNAPSHOT_INTERVAL)
+
+    app = App()
+
+    if profiler is not None:
+        reported = False
+
+        def on_map(event):
+            nonlocal reported
+            if reported or event.widget is not app:
+                return
+            reported = True
+
+            # The first frame is drawn once Tk is done with idle tasks queued by mapping the window
+            app.after_idle(lambda: report_startup(profiler, Config.STARTUP_PROFILE_FILE))
+
+        app.bind('<Map>', on_map, add='+')
+
+    app.mainloop()
+
+
+def report_startup(profiler: StartupProfiler, path) -> None:
+    """Write the startup profile and print it, if there is a console.
+
+    Args:
+        profiler (StartupProfiler): Profiler started at launch.
+        path (Path): Path to the report file.
+    """
+
+    try:
+        report = profiler.report(time.perf_counter(), path)
+    except OSError as e:
+        logger.warning('Failed to write startup profile: %s', e)
+        return
+
+    # No console in a windowed (frozen) app
+    if sys.stdout is not None:
+        print(report)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,410 @@
+import bisect
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Prefix of all metric names
+NAMESPACE = 'amscrobbler'
+
+# Upper bounds of latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    """Monotonically increasing value, e.g. number of retries."""
+
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the counter.
+
+        Args:
+            amount (float, optional): Amount to increase by. Defaults to 1.
+        """
+
+        with self._lock:
+            self.value += amount
+
+    def sample(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """Value that can go up and down, e.g. queue depth."""
+
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        """Set the gauge.
+
+        Args:
+            value (float): New value.
+        """
+
+        self.value = value
+
+    def sample(self) -> float:
+        return self.value
+
+
+class Histogram:
+    """Distribution of observed values (e.g., latencies) in cumulative buckets, with their count and sum."""
+
+    kind = 'histogram'
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a value.
+
+        Args:
+            value (float): Observed value.
+        """
+
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def time(self) -> '_Timer':
+        """Measure duration of a `with` block in seconds.
+
+        Returns:
+            _Timer: Context manager observing the duration on exit.
+        """
+
+        return _Timer(self)
+
+    def sample(self) -> dict:
+        """Get cumulative bucket counts, total count and sum."""
+
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+
+        cumulative, buckets = 0, {}
+        for bound, n in zip((*self.buckets, math.inf), counts):
+            cumulative += n
+            buckets['+Inf' if bound == math.inf else repr(bound)] = cumulative
+
+        return {'buckets': buckets, 'count': count, 'sum': total}
+
+
+class _Timer:
+    """Context manager observing the duration of its block in a histogram."""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+def _flatten(name: str, value, labels: dict, out: list) -> None:
+    """Turn a `stats()` dict into (name, labels, value) samples.
+
+    Nested dicts become name suffixes, dicts of dicts (e.g., per-call stats) become a 'key' label.
+    Dicts with 'hits' and 'misses' also get a 'hit_ratio'.
+    """
+
+    if isinstance(value, bool):
+        value = int(value)
+
+    if isinstance(value, (int, float)):
+        out.append((name, labels, value))
+    elif isinstance(value, dict) and value:
+        if all(isinstance(item, dict) for item in value.values()):
+            for key, item in value.items():
+                _flatten(name, item, {**labels, 'key': str(key)}, out)
+        else:
+            for key, item in value.items():
+                _flatten(f'{name}_{key}', item, labels, out)
+
+            hits, misses = value.get('hits'), value.get('misses')
+            if isinstance(hits, int) and isinstance(misses, int) and hits + misses:
+                out.append((f'{name}_hit_ratio', labels, hits / (hits + misses)))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+
+    return '{' + ','.join(pairs) + '}'
+
+
+class MetricsRegistry:
+    """Process-wide registry of counters, gauges and histograms.
+
+    Metrics are identified by name and labels, and created on first use. Components that already keep their own
+    stats (e.g., `PollScheduler.stats()`) are registered as collectors instead, their stats are sampled into gauges
+    when metrics are exported.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._help = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, help: str, labels: dict, **kwargs):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(**kwargs)
+                    self._help[name] = help
+
+        return metric
+
+    def counter(self, name: str, help: str, **labels) -> Counter:
+        """Get a counter.
+
+        Args:
+            name (str): Name of the metric, without the namespace.
+            help (str): Description of the metric.
+            **labels: Labels of the metric.
+
+        Returns:
+            Counter: The counter.
+        """
+
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, **labels) -> Gauge:
+        """Get a gauge.
+
+        Args:
+            name (str): Name of the metric, without the namespace.
+            help (str): Description of the metric.
+            **labels: Labels of the metric.
+
+        Returns:
+            Gauge: The gauge.
+        """
+
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = LATENCY_BUCKETS, **labels) -> Histogram:
+        """Get a histogram.
+
+        Args:
+            name (str): Name of the metric, without the namespace.
+            help (str): Description of the metric.
+            buckets (tuple[float, ...], optional): Upper bounds of buckets. Defaults to `LATENCY_BUCKETS`.
+            **labels: Labels of the metric.
+
+        Returns:
+            Histogram: The histogram.
+        """
+
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def register_collector(self, prefix: str, stats: Callable[[], dict]) -> None:
+        """Register a function returning stats of a component, replacing one registered with the same prefix.
+
+        Args:
+            prefix (str): Name prefix of the sampled gauges, e.g. 'scheduler'.
+            stats (Callable[[], dict]): Function returning a dict of numbers (can be nested).
+        """
+
+        with self._lock:
+            self._collectors[prefix] = stats
+
+    def collect(self) -> list[tuple[str, str, str, dict, float | dict]]:
+        """Sample all metrics and collectors.
+
+        Returns:
+            list[tuple[str, str, str, dict, float | dict]]: Name, type, help, labels and value of every metric.
+                Value of a histogram is a dict with 'buckets', 'count' and 'sum'.
+        """
+
+        with self._lock:
+            metrics = list(self._metrics.items())
+            collectors = list(self._collectors.items())
+
+        samples = []
+        for (name, labels), metric in sorted(metrics, key=lambda item: item[0]):
+            samples.append((f'{NAMESPACE}_{name}', metric.kind, self._help[name], dict(labels), metric.sample()))
+
+        for prefix, stats in collectors:
+            try:
+                values = []
+                _flatten(f'{NAMESPACE}_{prefix}', stats(), {}, values)
+            except Exception:
+                logger.warning("Couldn't collect stats, prefix: %s", prefix, exc_info=True)
+                continue
+
+            for name, labels, value in values:
+                samples.append((name, 'gauge', f'Sampled from {prefix} stats', labels, value))
+
+        return samples
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format.
+
+        Returns:
+            str: Metrics.
+        """
+
+        # Samples of a metric must be listed together
+        families = {}
+        for name, kind, help, labels, value in self.collect():
+            families.setdefault((name, kind, help), []).append((labels, value))
+
+        lines = []
+        for (name, kind, help), samples in families.items():
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+
+            for labels, value in samples:
+                if kind == 'histogram':
+                    for bound, count in value['buckets'].items():
+                        lines.append(f'{name}_bucket{_format_labels({**labels, "le": bound})} {count}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {value["sum"]}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        """Get all metrics as a JSON-serializable dict.
+
+        Returns:
+            dict: 'timestamp' and 'metrics' - dict of name to list of dicts with 'labels' and 'value'.
+        """
+
+        metrics = {}
+        for name, _, _, labels, value in self.collect():
+            metrics.setdefault(name, []).append({'labels': labels, 'value': value})
+
+        return {'timestamp': time.time(), 'metrics': metrics}
+
+
+registry = MetricsRegistry()
+
+
+def timed(stage: str) -> Callable:
+    """Decorator recording durations of calls into the `stage_duration_seconds` histogram.
+
+    Args:
+        stage (str): Value of the 'stage' label.
+
+    Returns:
+        Callable: Decorator.
+    """
+
+    histogram = registry.histogram('stage_duration_seconds', 'Duration of processing stages in seconds', stage=stage)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def start_http_server(port: int) -> None:
+    """Serve metrics in Prometheus text format at `http://127.0.0.1:<port>/metrics` on a daemon thread.
+
+    Args:
+        port (int): Port to listen on.
+    """
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    except OSError:
+        logger.warning("Couldn't start metrics server, port: %d", port, exc_info=True)
+        return
+
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def write_snapshot(path: Path) -> None:
+    """Write a JSON snapshot of all metrics.
+
+    Args:
+        path (Path): Path to the snapshot file.
+    """
+
+    tmp_path = path.with_suffix('.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(registry.snapshot(), file, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("Couldn't write metrics snapshot, path: %s", path, exc_info=True)
+
+
+def start_snapshots(path: Path, interval: float) -> None:
+    """Write a JSON snapshot of all metrics every `interval` seconds on a daemon thread.
+
+    Args:
+        path (Path): Path to the snapshot file.
+        interval (float): Seconds between snapshots.
+    """
+
+    def run():
+        while True:
+            time.sleep(interval)
+            write_snapshot(path)
+
+    threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,325 @@
+import importlib.abc
+import importlib.machinery
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Loader wrapper that measures how long executing a module takes."""
+
+    def __init__(self, loader: importlib.abc.Loader, profiler: 'StartupProfiler'):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec: importlib.machinery.ModuleSpec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self.profiler._enter(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._exit()
+
+    def __getattr__(self, name: str):
+        # Other loader methods (e.g., `get_resource_reader()`) are used as is
+        return getattr(self.loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps loaders of all other finders with `_TimedLoader`."""
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self.profiler = profiler
+
+    def find_spec(self, name: str, path, target=None) -> importlib.machinery.ModuleSpec | None:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self.profiler)
+                return spec
+
+        return None
+
+
+class StartupProfiler:
+    """Measures import cost of every module loaded during startup and time to the first frame of the window.
+
+    Import times are inclusive (with the module's own imports) and self (without them), like `python -X importtime`,
+    but it also works in the frozen app. Imports are timed per thread (e.g., the background thread imports
+    the scrapers while the main thread is still building the window), and listed with the importing thread.
+    """
+
+    def __init__(self, started: float):
+        """Initialize the profiler.
+
+        Args:
+            started (float): `time.perf_counter()` value at the very start of the app.
+        """
+
+        self.started = started
+
+        # (thread name, module name) -> (inclusive time, self time)
+        self.imports = {}
+        self._local = threading.local()
+        self._finder = _TimingFinder(self)
+
+    def start(self) -> None:
+        """Start measuring imports."""
+
+        sys.meta_path.insert(0, self._finder)
+
+    def stop(self) -> None:
+        """Stop measuring imports."""
+
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def _enter(self, name: str) -> None:
+        """Start timing a module."""
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self) -> None:
+        """Finish timing a module, its inclusive time is subtracted from the self time of the importing module."""
+
+        stack = self._local.stack
+        name, start, children = stack.pop()
+        elapsed = time.perf_counter() - start
+        self.imports[(threading.current_thread().name, name)] = (elapsed, elapsed - children)
+
+        if stack:
+            stack[-1][2] += elapsed
+
+    def report(self, first_frame: float, path: Path, top: int = 30) -> str:
+        """Write a report to a file.
+
+        Args:
+            first_frame (float): `time.perf_counter()` value when the first frame of the window was drawn.
+            path (Path): Path to the report file.
+            top (int, optional): Number of most expensive modules to list. Defaults to 30.
+
+        Returns:
+            str: The report.
+        """
+
+        self.stop()
+
+        # Threads import in parallel, so their times are summed separately
+        per_thread = {}
+        for (thread, _), (_, self_time) in self.imports.items():
+            count, total_self = per_thread.get(thread, (0, 0.0))
+            per_thread[thread] = (count + 1, total_self + self_time)
+
+        lines = [f'Time to first frame: {(first_frame - self.started) * 1000:.0f} ms']
+        for thread, (count, total_self) in per_thread.items():
+            lines.append(f'Imports on {thread}: {count} modules, {total_self * 1000:.0f} ms')
+        lines += ['', f'{"self, ms":>9} {"total, ms":>10}  {"thread":<12} module']
+
+        by_total = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        for (thread, name), (total, self_time) in by_total[:top]:
+            lines.append(f'{self_time * 1000:9.1f} {total * 1000:10.1f}  {thread:<12} {name}')
+
+        report = '\n'.join(lines) + '\n'
+        path.write_text(report, encoding='utf-8')
+
+        return report
+
+
+class SamplingProfiler:
+    """Low-overhead sampling profiler for long runs (e.g., a whole day), enabled on demand.
+
+    A daemon thread takes stacks of the watched threads (by name) from `sys._current_frames()` every `interval`
+    seconds and counts them. Counts are dumped in collapsed stack format (`thread;outer;...;inner count` per line),
+    which flamegraph tools take as is, every `dump_interval` seconds and on stop. Stacks are wall-clock: a thread
+    waiting (e.g., in `PollScheduler.wait()` or the Tk main loop) is sampled in its waiting function.
+
+    Optionally, top allocation sites from `tracemalloc` are appended to a text file every `memory_interval` seconds,
+    together with the biggest changes since the previous snapshot.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        threads: tuple[str, ...] = ('MainThread', 'background'),
+        interval: float = 0.05,
+        dump_interval: float = 60.0,
+        memory_interval: float = 600.0,
+        memory_top: int = 20,
+    ):
+        """Initialize the profiler.
+
+        Args:
+            directory (Path): Directory for output files.
+            threads (tuple[str, ...], optional): Names of threads to sample. Defaults to the Tk main thread and
+                the scrobbling background thread.
+            interval (float, optional): Seconds between samples. Defaults to 0.05.
+            dump_interval (float, optional): Seconds between dumps of collapsed stacks. Defaults to 60.0.
+            memory_interval (float, optional): Seconds between `tracemalloc` snapshots, 0 to not trace memory.
+                Defaults to 600.0.
+            memory_top (int, optional): Number of allocation sites per snapshot. Defaults to 20.
+        """
+
+        self.directory = directory
+        self.threads = threads
+        self.interval = interval
+        self.dump_interval = dump_interval
+        self.memory_interval = memory_interval
+        self.memory_top = memory_top
+
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+
+        self._labels = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stacks_path = None
+        self._memory_path = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the profiler is running."""
+
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start profiling into new files named after the current time."""
+
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            name = time.strftime('%Y%m%d-%H%M%S')
+            self._stacks_path = self.directory / f'profile-{name}.folded'
+            self._memory_path = self.directory / f'memory-{name}.txt'
+            self.stacks.clear()
+            self.samples = 0
+            self.sampling_time = 0.0
+
+            if self.memory_interval and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._snapshot = None
+
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+            self._thread.start()
+
+        logger.info('Profiling started, writing to %s', self._stacks_path)
+
+    def stop(self) -> None:
+        """Stop profiling and dump what was collected."""
+
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+
+            self._stop.set()
+            thread.join()
+            self._thread = None
+
+            self._dump_stacks()
+            if tracemalloc.is_tracing():
+                self._dump_memory()
+                tracemalloc.stop()
+
+        mean_time = self.sampling_time / self.samples if self.samples else 0.0
+        logger.info('Profiling stopped, %d samples, %.3f ms per sample', self.samples, mean_time * 1000)
+
+    def _run(self) -> None:
+        """Sample stacks until stopped, dumping them periodically."""
+
+        next_dump = time.monotonic() + self.dump_interval
+        next_memory = time.monotonic() + self.memory_interval if self.memory_interval else None
+
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+            now = time.monotonic()
+            if now >= next_dump:
+                self._dump_stacks()
+                next_dump = now + self.dump_interval
+            if next_memory is not None and now >= next_memory:
+                self._dump_memory()
+                next_memory = now + self.memory_interval
+
+    def _sample(self) -> None:
+        """Count current stacks of the watched threads."""
+
+        start = time.perf_counter()
+
+        names = {thread.ident: thread.name for thread in threading.enumerate() if thread.name in self.threads}
+        for ident, frame in sys._current_frames().items():
+            name = names.get(ident)
+            if name is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(name)
+            stack.reverse()
+
+            self.stacks[';'.join(stack)] += 1
+
+        self.samples += 1
+        self.sampling_time += time.perf_counter() - start
+
+    def _label(self, code) -> str:
+        """Get a frame label of a code object, e.g. 'PollScheduler.wait (scheduler.py)'."""
+
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f'{code.co_qualname} ({os.path.basename(code.co_filename)})'.replace(';', ':')
+        return label
+
+    def _dump_stacks(self) -> None:
+        """Write all counted stacks in collapsed stack format, replacing the previous dump."""
+
+        lines = [f'{stack} {count}\n' for stack, count in self.stacks.copy().items()]
+
+        tmp_path = self._stacks_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                file.writelines(lines)
+            os.replace(tmp_path, self._stacks_path)
+        except OSError:
+            logger.warning("Couldn't write profile, path: %s", self._stacks_path, exc_info=True)
+
+    def _dump_memory(self) -> None:
+        """Append top allocation sites and their changes since the previous snapshot."""
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [f'=== {time.strftime("%Y-%m-%d %H:%M:%S")}, traced: {current / 1024:.0f} KiB, peak: {peak / 1024:.0f} KiB', 'Top:']
+        lines.extend(f'  {stat}' for stat in snapshot.statistics('lineno')[: self.memory_top])
+        if self._snapshot is not None:
+            lines.append('Changes:')
+            lines.extend(f'  {stat}' for stat in snapshot.compare_to(self._snapshot, 'lineno')[: self.memory_top])
+        self._snapshot = snapshot
+
+        try:
+            with open(self._memory_path, 'a', encoding='utf-8') as file:
+                file.write('\n'.join(lines) + '\n\n')
+        except OSError:
+            logger.warning("Couldn't write memory profile, path: %s", self._memory_path, exc_info=True)
@@ -1,11 +1,15 @@
+import ctypes
 import os
 import sys
 from datetime import timedelta
 
-import numpy as np
-import psutil
 from PIL import Image, ImageDraw
 
+ERROR_ALREADY_EXISTS = 183
+
+# Handle of the named mutex held by this instance of the app
+_instance_mutex = None
+
 
 def make_circle(img: Image.Image) -> Image.Image:
     """Return a circularly cropped version of the given image.
@@ -18,7 +22,6 @@ def make_circle(img: Image.Image) -> Image.Image:
     """
 
     img = img.convert("RGB")
-    np_image = np.array(img)
     w, h = img.size
 
     # Create alpha mask
@@ -27,10 +30,9 @@ def make_circle(img: Image.Image) -> Image.Image:
     draw.pieslice([5, 5, w - 5, h - 5], 0, 360, fill=255)
 
     # Combine RGB image with alpha mask
-    np_alpha = np.array(alpha)
-    np_image = np.dstack((np_image, np_alpha))
+    img.putalpha(alpha)
 
-    return Image.fromarray(np_image)
+    return img
 
 
 def is_gif(img: Image.Image) -> bool:
@@ -46,21 +48,6 @@ def is_gif(img: Image.Image) -> bool:
     return bool(getattr(img, "is_animated", False))
 
 
-def get_process_id(process_name: str) -> int | None:
-    """Get the process ID (PID) of a process by its name.
-
-    Args:
-        process_name (str): Name of the process.
-
-    Returns:
-        int | None: PID if found, otherwise None.
-    """
-
-    for proc in psutil.process_iter(['pid', 'name']):
-        if proc.info['name'] == process_name:
-            return proc.info['pid']
-
-
 def get_executable_name() -> str | None:
     """Return the name of the current executable if running as a frozen .exe.
 
@@ -75,13 +62,32 @@ def get_executable_name() -> str | None:
 def single_instance() -> None:
     """Ensure only one instance of the app is running.
 
-    If more than one process with the name of the app is found, the program will terminate with exit code 1.
+    On Windows a named mutex is created, if it already exists (created by another instance) the program will terminate
+    with exit code 1. Elsewhere processes are scanned, and if more than one process with the name of the app is found,
+    the program will terminate with exit code 1.
     """
 
+    global _instance_mutex
+
     process_name = get_executable_name()
     if process_name is None:
         return
 
+    if sys.platform == 'win32':
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.CreateMutexW.argtypes = (ctypes.c_void_p, ctypes.c_bool, ctypes.c_wchar_p)
+        kernel32.CreateMutexW.restype = ctypes.c_void_p
+
+        # The mutex is released by Windows when the process exits
+        _instance_mutex = kernel32.CreateMutexW(None, False, f'Local\\{process_name}')
+        if _instance_mutex:
+            if ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
+                sys.exit(1)
+            return
+
+    # Couldn't create the mutex, fall back to scanning processes
+    import psutil
+
     n = 0
     for proc in psutil.process_iter(['pid', 'name']):
         if proc.info['name'] == process_name: